@@ -1,63 +1,79 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.schemas.conversation_schema import ConversationRead
-from app.services.conversation_service import ConversationService
+from app.schemas.conversation_schema import ConversationRead, last_message_payload
+from app.services.conversation_service import (
+    CONVERSATION_PAGE_MAX,
+    ConversationService,
+)
 from app.services.conversation_settings_service import ConversationSettingsService
 from app.api.deps.authentication import get_current_user
 from app.database.connection import get_db
 from app.core.exceptions import AppException
+from app.websocket.state import connection_manager
 
 router = APIRouter(prefix="/api/v1/conversations", tags=["Conversations"])
 
 
 @router.get("")
 async def list_my_conversations(
-    current_user=Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    response: Response,
+    cursor: str | None = Query(None, description="X-Next-Cursor of the last page"),
+    limit: int = Query(50, ge=1, le=CONVERSATION_PAGE_MAX),
+    with_user: bool = Query(False, description="Embed the other user's profile"),
+    current_user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
-    rows = await ConversationService.list_conversation_full(
-        db=db, user_id=current_user.id
+    """
+    The inbox, pinned first and then by last activity. When more remains, the
+    cursor for the next page is returned in the X-Next-Cursor header.
+    With `with_user`, each row carries the other user's username, last seen
+    and presence, read in the same query, so the inbox renders from one call.
+    """
+
+    rows, next_cursor = await ConversationService.list_conversation_page(
+        db=db,
+        user_id=current_user.id,
+        cursor=cursor,
+        limit=limit,
+        with_other_user=with_user,
     )
 
-    response = []
-
-    for (
-        conv,
-        unread_count,
-        msg_id,
-        sender_id,
-        content,
-        sent_at,
-        is_muted,
-        is_pinned,
-    ) in rows:
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    conversations = []
+
+    for conv, unread_count, is_muted, is_pinned, *user in rows:
         other_user = (
             conv.user2_id if conv.user1_id == current_user.id else conv.user1_id
         )
 
-        response.append(
-            {
-                "id": str(conv.id),
-                "other_user_id": str(other_user),
-                "unread_count": unread_count or 0,
-                "is_muted": is_muted or False,
-                "is_pinned": is_pinned or False,
-                "last_message": (
-                    None
-                    if msg_id is None
-                    else {
-                        "id": str(msg_id),
-                        "sender_id": str(sender_id),
-                        "content": content,
-                        "sent_at": sent_at.isoformat(),
-                    }
+        item = {
+            "id": str(conv.id),
+            "other_user_id": str(other_user),
+            "unread_count": unread_count or 0,
+            "is_muted": is_muted or False,
+            "is_pinned": is_pinned or False,
+            "last_message": last_message_payload(conv),
+            "last_activity_at": conv.last_activity_at.isoformat(),
+            "created_at": conv.created_at.isoformat(),
+            "updated_at": conv.updated_at.isoformat(),
+        }
+
+        if user:
+            item["other_user"] = {
+                "id": str(other_user),
+                "username": user[0].username,
+                "is_online": str(other_user) in connection_manager.active_users,
+                "last_seen": (
+                    user[0].last_seen.isoformat() if user[0].last_seen else None
                 ),
-                "created_at": conv.created_at.isoformat(),
-                "updated_at": conv.updated_at.isoformat(),
             }
-        )
 
-    return response
+        conversations.append(item)
+
+    return conversations
 
 
 @router.get("/{conversation_id}")
@@ -1,13 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps.authentication import get_current_user
 from app.database.connection import get_db
 from app.schemas.message_schema import MessageRead, MessageCreate
 from app.services.conversation_service import ConversationService
-from app.services.message_service import MessageService
+from app.services.message_service import MESSAGE_PAGE_MAX, MessageService
 from app.core.exceptions import AppException
 from app.utils.uuid_util import to_uuid
+from app.websocket.state import connection_manager
 
 router = APIRouter(prefix="/api/v1/messages", tags=["Messages"])
 
@@ -46,11 +47,33 @@ async def send_message(
 @router.get("/{conversation_id}", response_model=list[MessageRead])
 async def list_messages(
     conversation_id: str,
+    before: int | None = Query(None, description="Page back from this seq"),
+    after: int | None = Query(None, description="Page forward from this seq"),
+    around: str | None = Query(None, description="Message id to centre on"),
+    limit: int = Query(50, ge=1, le=MESSAGE_PAGE_MAX),
     current_user=Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
+    """
+    Message history, newest first. Pass the `seq` of the last message shown
+    as `before` to load older ones, or of the first as `after` for newer ones.
+    """
+
+    if sum(cursor is not None for cursor in (before, after, around)) > 1:
+        raise AppException("Use only one of before, after and around")
+
     conversation_uuid = await to_uuid(conversation_id)
 
+    # Recent pages of active conversations come from the recent-message
+    # buffer, which also knows both members
+    if after is None and around is None:
+        cached = connection_manager.recent.before_seq(
+            str(conversation_uuid), str(current_user.id), before, limit
+        )
+
+        if cached is not None:
+            return cached
+
     conversation = await ConversationService.get_by_id(db, conversation_uuid)
 
     if not conversation:
@@ -63,6 +86,17 @@ async def list_messages(
     if not can_access:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
 
-    messages = await MessageService.list_messages(db, conv_id=conversation_uuid)
+    if around is not None:
+        return await MessageService.list_messages_around(
+            db, conv_id=conversation_uuid, message_id=around, limit=limit
+        )
+
+    messages = await MessageService.list_messages(
+        db,
+        conv_id=conversation_uuid,
+        limit=limit,
+        before_seq=before,
+        after_seq=after,
+    )
 
     return messages
@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.conversation_schema import last_message_payload
+from app.schemas.friendship_schema import FriendshipRead
+from app.services.sync_service import SyncService
+from app.api.deps.authentication import get_current_user
+from app.database.connection import get_db
+
+router = APIRouter(prefix="/api/v1/sync", tags=["Sync"])
+
+
+@router.get("")
+async def sync_inbox(
+    token: str | None = Query(None, description="Token returned by the last sync"),
+    current_user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Inbox rows changed since `token`: conversations, unread counters,
+    settings and friendships, each to be upserted by id, plus the token for
+    the next call. Without a token everything is returned. When `reset` is
+    true the client reloads the inbox in full and keeps the new token.
+    """
+
+    changes = await SyncService.changes_since(
+        db=db, user_id=current_user.id, token=token
+    )
+
+    return {
+        "token": changes["token"],
+        "reset": changes["reset"],
+        "conversations": [
+            {
+                "id": str(conv.id),
+                "other_user_id": str(
+                    conv.user2_id if conv.user1_id == current_user.id else conv.user1_id
+                ),
+                "last_message": last_message_payload(conv),
+                "last_activity_at": conv.last_activity_at.isoformat(),
+                "updated_at": conv.updated_at.isoformat(),
+            }
+            for conv in changes["conversations"]
+        ],
+        "unread": [
+            {
+                "conversation_id": str(entry.conversation_id),
+                "unread_count": entry.unread_count,
+                "updated_at": entry.updated_at.isoformat(),
+            }
+            for entry in changes["unread"]
+        ],
+        "settings": [
+            {
+                "conversation_id": str(entry.conversation_id),
+                "is_muted": entry.is_muted,
+                "is_pinned": entry.is_pinned,
+                "updated_at": entry.updated_at.isoformat(),
+            }
+            for entry in changes["settings"]
+        ],
+        "friendships": [
+            {
+                **FriendshipRead.model_validate(friendship).model_dump(mode="json"),
+                "updated_at": friendship.updated_at.isoformat(),
+            }
+            for friendship in changes["friendships"]
+        ],
+    }
@@ -1,11 +1,16 @@
+from functools import partial
 from fastapi import APIRouter, WebSocket, Depends
+from typing import Callable
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
 from app.websocket.state import connection_manager
 from app.websocket.deps import get_current_user_ws
-from app.websocket.events import dispatch_event
+from app.websocket.events import event_lane, run_event
+from app.websocket.pipeline import EventPipeline
+from app.websocket.presence import announce_offline, announce_online
 from app.services.conversation_service import ConversationService
 from app.services.message_service import MessageService
-from app.database.connection import get_db
+from app.database.connection import get_session_factory
 from app.utils.uuid_util import to_uuid
 
 router = APIRouter()
@@ -16,21 +21,21 @@ async def websocket_chat(
     websocket: WebSocket,
     conversation_id: str,
     user=Depends(get_current_user_ws),
-    db: AsyncSession = Depends(get_db),
+    sessions: Callable[[], AsyncSession] = Depends(get_session_factory),
 ):
     conversation_uuid = await to_uuid(conversation_id)
 
-    conversation = await ConversationService.get_by_id(
-        db, conversation_id=conversation_uuid
-    )
-
-    if not conversation:
-        await websocket.close()
-        return
+    # Nothing holds a pooled connection for the lifetime of the socket
+    async with sessions() as db:
+        conversation = await ConversationService.get_by_id(
+            db, conversation_id=conversation_uuid
+        )
 
-    can_access = await MessageService.can_user_access_conversation(
-        db, conversation=conversation, user_id=user.id
-    )
+        can_access = conversation is not None and (
+            await MessageService.can_user_access_conversation(
+                db, conversation=conversation, user_id=user.id
+            )
+        )
 
     if not can_access:
         await websocket.close()
@@ -42,37 +47,49 @@ async def websocket_chat(
     )
 
     if status == "online":
-        await connection_manager.broadcast_presence(str(user.id), "online")
+        await announce_online(sessions, user)
+
+    connection = connection_manager.connections[websocket]
+
+    pipeline = EventPipeline(max_in_flight=settings.ws_max_in_flight_events)
+
+    async def handle(event_name: str, data: dict):
+        await run_event(
+            event_name=event_name,
+            data=data,
+            websocket=websocket,
+            user=user,
+            conversation=conversation,
+            conversation_id=conversation_id,
+            manager=connection_manager,
+            sessions=sessions,
+        )
 
     try:
         while True:
-            data = await websocket.receive_json()
+            data = await connection.receive()
             event_name: str = str(data.get("event"))
 
-            await dispatch_event(
-                event_name=event_name,
-                data=data,
-                websocket=websocket,
-                user=user,
-                conversation=conversation,
-                conversation_id=conversation_id,
-                manager=connection_manager,
-                db=db,
-            )
+            lane = event_lane(event_name, data, conversation_id)
+            job = partial(handle, event_name, data)
+
+            if lane is not None:
+                job = partial(
+                    connection_manager.run_in_conversation, conversation_id, job
+                )
+
+            await pipeline.submit(lane, job)
     except Exception:
         pass
     finally:
-        status = connection_manager.disconnect(websocket=websocket, user_id=user.id)
+        await pipeline.close()
+
+        status = connection_manager.disconnect(
+            websocket=websocket, user_id=str(user.id)
+        )
         connection_manager.leave_conversation(
             websocket=websocket, conversation_id=conversation_id
         )
 
         if status == "offline":
-            result = await connection_manager.delayed_presence_check(str(user.id))
-            if result == "offline":
-                from datetime import datetime, UTC
-
-                user.last_seen = datetime.now(UTC)
-                await db.commit()
-
-                await connection_manager.broadcast_presence(str(user.id), "offline")
+            await announce_offline(sessions, user)
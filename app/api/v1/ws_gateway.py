@@ -0,0 +1,175 @@
+from functools import partial
+from typing import Callable, Dict, Optional
+from fastapi import APIRouter, WebSocket, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.exceptions import AppException
+from app.models.conversation_model import Conversation
+from app.models.user_model import User
+from app.websocket.state import connection_manager, notification_manager
+from app.websocket.deps import get_current_user_ws
+from app.websocket.events import event_lane, run_event
+from app.websocket.pipeline import EventPipeline
+from app.websocket.presence import announce_offline, announce_online
+from app.services.conversation_service import ConversationService
+from app.services.message_service import MessageService
+from app.database.connection import get_session_factory
+from app.utils.uuid_util import to_uuid
+
+router = APIRouter()
+
+
+async def _subscribe(
+    sessions: Callable[[], AsyncSession],
+    websocket: WebSocket,
+    user: User,
+    subscriptions: Dict[str, Conversation],
+    conversation_id,
+):
+    conversation_key = str(await to_uuid(conversation_id))
+
+    if conversation_key not in subscriptions:
+        async with sessions() as db:
+            conversation = await ConversationService.get_by_id(
+                db, conversation_id=conversation_key
+            )
+
+            can_access = conversation is not None and (
+                await MessageService.can_user_access_conversation(
+                    db, conversation=conversation, user_id=user.id
+                )
+            )
+
+        if not conversation or not can_access:
+            raise AppException(f"Cannot subscribe to conversation {conversation_key}")
+
+        subscriptions[conversation_key] = conversation
+        connection_manager.join_conversation(websocket, conversation_key)
+
+    await connection_manager.send_to_socket(
+        websocket, {"event": "subscribed", "conversation_id": conversation_key}
+    )
+
+
+async def _unsubscribe(
+    websocket: WebSocket, subscriptions: Dict[str, Conversation], conversation_id
+):
+    conversation_key = str(await to_uuid(conversation_id))
+
+    if subscriptions.pop(conversation_key, None) is not None:
+        connection_manager.leave_conversation(websocket, conversation_key)
+
+    await connection_manager.send_to_socket(
+        websocket, {"event": "unsubscribed", "conversation_id": conversation_key}
+    )
+
+
+@router.websocket("/ws")
+async def websocket_gateway(
+    websocket: WebSocket,
+    user=Depends(get_current_user_ws),
+    sessions: Callable[[], AsyncSession] = Depends(get_session_factory),
+):
+    """
+    One socket per client for every conversation plus notifications.
+    Clients send `subscribe`/`unsubscribe` with a `conversation_id` (or a list
+    in `conversation_ids`), and every chat event carries the `conversation_id`
+    it applies to.
+    """
+
+    user_id = str(user.id)
+    subscriptions: Dict[str, Conversation] = {}
+
+    status = await connection_manager.connect(websocket=websocket, user_id=user_id)
+    notification_manager.attach(connection_manager.connections[websocket])
+
+    if status == "online":
+        await announce_online(sessions, user)
+
+    connection = connection_manager.connections[websocket]
+
+    pipeline = EventPipeline(max_in_flight=settings.ws_max_in_flight_events)
+
+    async def handle(
+        event_name: str,
+        data: dict,
+        conversation: Optional[Conversation],
+        conversation_key: Optional[str],
+    ):
+        await run_event(
+            event_name=event_name,
+            data=data,
+            websocket=websocket,
+            user=user,
+            conversation=conversation,
+            conversation_id=conversation_key,
+            manager=connection_manager,
+            sessions=sessions,
+        )
+
+    try:
+        while True:
+            data = await connection.receive()
+            event_name: str = str(data.get("event"))
+
+            try:
+                if event_name in ("subscribe", "unsubscribe"):
+                    conversation_ids = data.get("conversation_ids") or [
+                        data.get("conversation_id")
+                    ]
+
+                    # Handled in the read loop so later events see the change
+                    for conversation_id in conversation_ids:
+                        if event_name == "subscribe":
+                            await _subscribe(
+                                sessions,
+                                websocket,
+                                user,
+                                subscriptions,
+                                conversation_id,
+                            )
+                        else:
+                            await _unsubscribe(
+                                websocket, subscriptions, conversation_id
+                            )
+
+                    continue
+
+                if event_name == "reconnect":
+                    # Resumes are scoped by their own payload, not by a room
+                    await pipeline.submit(
+                        ("reconnect",), partial(handle, event_name, data, None, None)
+                    )
+                    continue
+
+                conversation_key = str(await to_uuid(data.get("conversation_id")))
+                conversation = subscriptions.get(conversation_key)
+
+                if not conversation:
+                    raise AppException(
+                        f"Not subscribed to conversation {conversation_key}"
+                    )
+
+                lane = event_lane(event_name, data, conversation_key)
+                job = partial(handle, event_name, data, conversation, conversation_key)
+
+                if lane is not None:
+                    job = partial(
+                        connection_manager.run_in_conversation, conversation_key, job
+                    )
+
+                await pipeline.submit(lane, job)
+            except AppException as e:
+                await connection_manager.send_to_socket(
+                    websocket, {"event": "error", "message": e.message}
+                )
+    except Exception:
+        pass
+    finally:
+        await pipeline.close()
+
+        notification_manager.disconnect(websocket=websocket, user_id=user_id)
+        status = connection_manager.disconnect(websocket=websocket, user_id=user_id)
+
+        if status == "offline":
+            await announce_offline(sessions, user)
@@ -1,9 +1,7 @@
 from fastapi import APIRouter, WebSocket, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.websocket.state import notification_manager
 from app.websocket.deps import get_current_user_ws
-from app.database.connection import get_db
 
 router = APIRouter()
 
@@ -12,13 +10,13 @@ router = APIRouter()
 async def websocket_notifications(
     websocket: WebSocket,
     user=Depends(get_current_user_ws),
-    db: AsyncSession = Depends(get_db),
 ):
     await notification_manager.connect(websocket=websocket, user_id=str(user.id))
+    connection = notification_manager.connections[websocket]
 
     try:
         while True:
-            await websocket.receive_text()
+            await connection.receive()
     except Exception:
         pass
     finally:
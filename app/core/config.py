@@ -14,6 +14,22 @@ class Settings(BaseModel):
     access_token_expire_minutes: int = int(
         os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 3600)
     )
+    ws_outbound_queue_size: int = int(os.getenv("WS_OUTBOUND_QUEUE_SIZE", 256))
+    ws_overflow_policy: str = os.getenv("WS_OVERFLOW_POLICY", "drop_low_value")
+    ws_ping_interval_seconds: float = float(os.getenv("WS_PING_INTERVAL_SECONDS", 25))
+    ws_ping_timeout_seconds: float = float(os.getenv("WS_PING_TIMEOUT_SECONDS", 60))
+    ws_max_in_flight_events: int = int(os.getenv("WS_MAX_IN_FLIGHT_EVENTS", 16))
+    ws_conversation_actors: bool = os.getenv(
+        "WS_CONVERSATION_ACTORS", "false"
+    ).lower() in ("1", "true")
+    ws_recent_messages_per_conversation: int = int(
+        os.getenv("WS_RECENT_MESSAGES_PER_CONVERSATION", 50)
+    )
+    ws_recent_messages_max_bytes: int = int(
+        os.getenv("WS_RECENT_MESSAGES_MAX_BYTES", 32 * 1024**2)
+    )
+    backplane: str = os.getenv("BACKPLANE", "memory")
+    backplane_path: str = os.getenv("BACKPLANE_PATH", "/tmp/phichat-backplane")
 
 
 settings = Settings()
@@ -1,4 +1,4 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Callable
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, AsyncEngine
 from sqlalchemy.orm import sessionmaker
 
@@ -17,3 +17,12 @@ AsyncSessionLocal = sessionmaker(  # type: ignore
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         yield session
+
+
+def get_session_factory() -> Callable[[], AsyncSession]:
+    """
+    For long-lived endpoints such as WebSockets: open a session per unit of
+    work instead of holding one pooled connection for the whole socket.
+    """
+
+    return AsyncSessionLocal
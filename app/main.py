@@ -1,16 +1,25 @@
+from contextlib import asynccontextmanager
 from typing import Callable, cast
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.exceptions import RequestValidationError
 from starlette.responses import Response
 from sqlalchemy.exc import SQLAlchemyError
 from app.core.config import settings
+from app.websocket.state import (
+    backplane,
+    connection_manager,
+    heartbeat,
+    notification_manager,
+)
 from app.api.v1.auth import router as auth_router
 from app.api.v1.users import router as users_router
 from app.api.v1.friends import router as friends_router
 from app.api.v1.conversations import router as conversations_router
 from app.api.v1.messages import router as messages_router
+from app.api.v1.sync import router as sync_router
 from app.api.v1.ws import router as websocket_router
 from app.api.v1.ws_notifications import router as ws_notifications_router
+from app.api.v1.ws_gateway import router as ws_gateway_router
 from app.core.exceptions import AppException, DatabaseException, UnauthorizedException
 from app.core.error_handlers import (
     app_exception_handler,
@@ -23,8 +32,17 @@ from app.core.error_handlers import (
 )
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await backplane.start()
+    await heartbeat.start()
+    yield
+    await heartbeat.stop()
+    await backplane.stop()
+
+
 def create_app():
-    app = FastAPI(title=settings.app_name)
+    app = FastAPI(title=settings.app_name, lifespan=lifespan)
 
     # Route handlers
     app.include_router(auth_router)
@@ -32,8 +50,10 @@ def create_app():
     app.include_router(friends_router)
     app.include_router(conversations_router)
     app.include_router(messages_router)
+    app.include_router(sync_router)
     app.include_router(websocket_router)
     app.include_router(ws_notifications_router)
+    app.include_router(ws_gateway_router)
 
     # Custom exception handlers
     app.add_exception_handler(
@@ -69,6 +89,14 @@ def create_app():
     async def health_check():
         return {"status": "ok"}
 
+    @app.get("/health/ws")
+    async def websocket_health_check():
+        return {
+            "chat": connection_manager.stats(),
+            "notifications": notification_manager.stats(),
+            "heartbeat": heartbeat.stats(),
+        }
+
     return app
 
 
@@ -1,12 +1,14 @@
 import uuid
 from datetime import datetime, UTC
 
-from sqlalchemy import DateTime, UniqueConstraint
+from sqlalchemy import DateTime, Index, Integer, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database.base import Base
 from app.database.custom_types import GUID
 
+PREVIEW_LENGTH = 200
+
 
 class Conversation(Base):
     __tablename__ = "conversations"
@@ -14,6 +16,27 @@ class Conversation(Base):
     id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
     user1_id: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False)
     user2_id: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False)
+    # Sequence number of the latest message, bumped by MessageService.send_message
+    last_seq: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    # Latest visible message, kept current by MessageService in the same
+    # transaction as the message itself so the inbox never reads `messages`
+    last_message_id: Mapped[uuid.UUID | None] = mapped_column(GUID(), nullable=True)
+    last_message_sender_id: Mapped[uuid.UUID | None] = mapped_column(
+        GUID(), nullable=True
+    )
+    last_message_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    last_message_preview: Mapped[str | None] = mapped_column(
+        String(PREVIEW_LENGTH), nullable=True
+    )
+    # Creation time until the first message, then the time of the latest send;
+    # the inbox is ordered on it
+    last_activity_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=lambda: datetime.now(UTC)
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(UTC)
     )
@@ -24,5 +47,22 @@ class Conversation(Base):
     )
 
     __table_args__ = (
+        # Its leading user1_id column also serves lookups by user1_id alone
         UniqueConstraint("user1_id", "user2_id", name="unique_conversation_pair"),
+        # Inbox pages: one keyset range scan per side of the pair
+        Index(
+            "ix_conversations_user1_id_activity",
+            "user1_id",
+            "last_activity_at",
+            "id",
+        ),
+        Index(
+            "ix_conversations_user2_id_activity",
+            "user2_id",
+            "last_activity_at",
+            "id",
+        ),
+        # Delta sync: rows of either side changed since a token
+        Index("ix_conversations_user1_id_updated_at", "user1_id", "updated_at"),
+        Index("ix_conversations_user2_id_updated_at", "user2_id", "updated_at"),
     )
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, UTC
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import DateTime, Boolean, ForeignKey
+from sqlalchemy import DateTime, Boolean, ForeignKey, Index, text
 from app.database.base import Base
 from app.database.custom_types import GUID
 
@@ -23,3 +23,21 @@ class ConversationSettings(Base):
         default=lambda: datetime.now(UTC),
         onupdate=lambda: datetime.now(UTC),
     )
+
+    __table_args__ = (
+        Index(
+            "ix_conversation_settings_conversation_id_user_id",
+            "conversation_id",
+            "user_id",
+            unique=True,
+        ),
+        # A user's pinned conversations, listed ahead of the rest
+        Index(
+            "ix_conversation_settings_user_id_pinned",
+            "user_id",
+            postgresql_where=text("is_pinned"),
+            sqlite_where=text("is_pinned"),
+        ),
+        # Delta sync: the user's settings changed since a token
+        Index("ix_conversation_settings_user_id_updated_at", "user_id", "updated_at"),
+    )
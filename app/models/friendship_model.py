@@ -2,7 +2,7 @@ import uuid
 import enum
 from datetime import datetime, UTC
 
-from sqlalchemy import DateTime, Enum
+from sqlalchemy import DateTime, Enum, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database.base import Base
@@ -32,3 +32,13 @@ class Friendship(Base):
         default=lambda: datetime.now(UTC),
         onupdate=lambda: datetime.now(UTC),
     )
+
+    __table_args__ = (
+        # Pair lookups lead with requester_id; friend and request lists
+        # filter one side by status
+        Index("ix_friendships_requester_id_status", "requester_id", "status"),
+        Index("ix_friendships_receiver_id_status", "receiver_id", "status"),
+        # Delta sync: either side's friendships changed since a token
+        Index("ix_friendships_requester_id_updated_at", "requester_id", "updated_at"),
+        Index("ix_friendships_receiver_id_updated_at", "receiver_id", "updated_at"),
+    )
@@ -2,7 +2,17 @@ import uuid
 import enum
 from datetime import datetime, UTC
 
-from sqlalchemy import DateTime, Text, Enum, ForeignKey, Boolean
+from sqlalchemy import (
+    DateTime,
+    Text,
+    Enum,
+    ForeignKey,
+    Boolean,
+    Index,
+    Integer,
+    UniqueConstraint,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database.base import Base
@@ -22,6 +32,8 @@ class Message(Base):
     conversation_id: Mapped[uuid.UUID] = mapped_column(
         GUID(), ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False
     )
+    # Position within the conversation, gap-free and strictly increasing
+    seq: Mapped[int] = mapped_column(Integer, nullable=False)
     sender_id: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False)
     receiver_id: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
@@ -41,3 +53,18 @@ class Message(Base):
     edited_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
+
+    __table_args__ = (
+        # Per-conversation history and reconnect catch-up, in (sent_at, id) order
+        Index("ix_messages_conversation_id_sent_at", "conversation_id", "sent_at"),
+        # Also the index behind resuming a conversation from a sequence number
+        UniqueConstraint("conversation_id", "seq", name="unique_message_seq"),
+        # Latest visible message of a conversation, e.g. list previews
+        Index(
+            "ix_messages_conversation_id_seq_undeleted",
+            "conversation_id",
+            "seq",
+            postgresql_where=text("NOT is_deleted"),
+            sqlite_where=text("NOT is_deleted"),
+        ),
+    )
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, UTC
 
-from sqlalchemy import DateTime, Integer, ForeignKey
+from sqlalchemy import DateTime, Integer, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database.base import Base
@@ -24,3 +24,14 @@ class ConversationUnread(Base):
         default=lambda: datetime.now(UTC),
         onupdate=lambda: datetime.now(UTC),
     )
+
+    __table_args__ = (
+        Index(
+            "ix_conversation_unread_conversation_id_user_id",
+            "conversation_id",
+            "user_id",
+            unique=True,
+        ),
+        # Delta sync: the user's counters changed since a token
+        Index("ix_conversation_unread_user_id_updated_at", "user_id", "updated_at"),
+    )
@@ -1,4 +1,5 @@
 from pydantic import BaseModel, UUID4, ConfigDict
+from app.models.conversation_model import PREVIEW_LENGTH
 
 
 class ConversationRead(BaseModel):
@@ -7,3 +8,28 @@ class ConversationRead(BaseModel):
     user2_id: UUID4
 
     model_config = ConfigDict(from_attributes=True)
+
+
+def last_message_payload(conversation) -> dict | None:
+    """The inbox preview of a conversation, from its last-message pointer."""
+
+    if conversation.last_message_id is None:
+        return None
+
+    return {
+        "id": str(conversation.last_message_id),
+        "sender_id": str(conversation.last_message_sender_id),
+        "content": conversation.last_message_preview,
+        "sent_at": conversation.last_message_at.isoformat(),
+    }
+
+
+def message_preview_payload(message) -> dict:
+    """The same preview for a message that has just become the latest one."""
+
+    return {
+        "id": str(message.id),
+        "sender_id": str(message.sender_id),
+        "content": message.content[:PREVIEW_LENGTH],
+        "sent_at": message.sent_at.isoformat(),
+    }
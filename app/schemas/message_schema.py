@@ -6,6 +6,7 @@ from datetime import datetime
 class MessageRead(BaseModel):
     id: UUID4
     conversation_id: UUID4
+    seq: int
     sender_id: UUID4
     receiver_id: UUID4
     content: str
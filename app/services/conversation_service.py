@@ -1,19 +1,26 @@
 import uuid
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_, and_, func
+from sqlalchemy import select, union_all, case, literal, or_, and_
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.models.conversation_model import Conversation
 from app.models.unread_model import ConversationUnread
 from app.models.conversation_settings_model import ConversationSettings
-from app.models.message_model import Message
+from app.models.user_model import User
 from app.core.exceptions import AppException, DatabaseException
+from app.schemas.conversation_schema import last_message_payload
 from app.services.conversation_settings_service import ConversationSettingsService
 from app.services.unread_service import UnreadService
 from app.services.user_service import UserService
 from app.websocket.state import connection_manager
+from app.utils.cursor_util import decode_cursor, encode_cursor
+from app.utils.datetime_util import parse_timestamp
 from app.utils.uuid_util import to_uuid
 
+# Upper bound for one inbox page, whatever the client asks for
+CONVERSATION_PAGE_MAX = 100
+
 
 class ConversationService:
 
@@ -49,6 +56,8 @@ class ConversationService:
             await db.commit()
             await db.refresh(conversation)
 
+            await connection_manager.broadcast_contact(str(user1_uuid), str(user2_uuid))
+
             return conversation
         except AppException:
             raise
@@ -56,28 +65,106 @@ class ConversationService:
             raise DatabaseException(str(e))
 
     @staticmethod
-    async def list_conversation_full(db: AsyncSession, user_id: str | uuid.UUID):
+    async def list_conversation_page(
+        db: AsyncSession,
+        user_id: str | uuid.UUID,
+        cursor: str | None = None,
+        limit: int = 50,
+        with_other_user: bool = False,
+    ):
+        """
+        One page of the user's inbox: pinned conversations first, then the
+        rest, each by last activity and id, newest first.
+        Returns the rows and the cursor of the next page (None on the last).
+        Rows are (conversation, unread_count, is_muted, is_pinned), plus the
+        other user when `with_other_user` is set, all from a single query.
+        Pinned rows come from the user's settings and the others from one
+        keyset range scan per side of the pair, so a page costs the same
+        however many conversations the user has.
+        """
+
         user_uuid = await to_uuid(user_id)
+        limit = max(1, min(limit, CONVERSATION_PAGE_MAX))
 
-        last_msg_subq = (
-            select(
-                Message.conversation_id, func.max(Message.sent_at).label("last_time")
-            )
-            .group_by(Message.conversation_id)
-            .subquery()
+        after_pinned, after = True, None
+
+        if cursor:
+            pinned_value, activity, conversation_id = decode_cursor(cursor, size=3)
+            after_pinned = bool(pinned_value)
+            after = (parse_timestamp(activity), await to_uuid(conversation_id))
+
+        is_pinned_here = and_(
+            ConversationSettings.conversation_id == Conversation.id,
+            ConversationSettings.user_id == user_uuid,
+            ConversationSettings.is_pinned.is_(True),
         )
 
+        def branch(stmt, pinned: bool):
+            if after is not None and pinned == after_pinned:
+                activity, conversation_id = after
+                stmt = stmt.where(
+                    or_(
+                        Conversation.last_activity_at < activity,
+                        and_(
+                            Conversation.last_activity_at == activity,
+                            Conversation.id < conversation_id,
+                        ),
+                    )
+                )
+
+            # One extra row tells whether another page exists
+            return (
+                stmt.order_by(
+                    Conversation.last_activity_at.desc(), Conversation.id.desc()
+                )
+                .limit(limit + 1)
+                .subquery()
+                .select()
+            )
+
+        def columns(pinned: bool):
+            return select(
+                Conversation.id,
+                Conversation.last_activity_at,
+                literal(int(pinned)).label("pinned"),
+            )
+
+        branches = [
+            # Each side walks its own (userN_id, last_activity_at, id) index
+            branch(
+                columns(False)
+                .where(column == user_uuid)
+                .where(~select(ConversationSettings.id).where(is_pinned_here).exists()),
+                pinned=False,
+            )
+            for column in (Conversation.user1_id, Conversation.user2_id)
+        ]
+
+        if after_pinned:
+            branches.append(
+                branch(
+                    columns(True)
+                    .join(ConversationSettings, is_pinned_here)
+                    .where(
+                        or_(
+                            Conversation.user1_id == user_uuid,
+                            Conversation.user2_id == user_uuid,
+                        )
+                    ),
+                    pinned=True,
+                )
+            )
+
+        page = union_all(*branches).subquery()
+
         stmt = (
             select(
                 Conversation,
                 ConversationUnread.unread_count,
-                Message.id,
-                Message.sender_id,
-                Message.content,
-                Message.sent_at,
                 ConversationSettings.is_muted,
                 ConversationSettings.is_pinned,
             )
+            .join(page, page.c.id == Conversation.id)
             .outerjoin(
                 ConversationUnread,
                 and_(
@@ -85,16 +172,6 @@ class ConversationService:
                     ConversationUnread.user_id == user_uuid,
                 ),
             )
-            .outerjoin(
-                last_msg_subq, last_msg_subq.c.conversation_id == Conversation.id
-            )
-            .outerjoin(
-                Message,
-                and_(
-                    Message.conversation_id == Conversation.id,
-                    Message.sent_at == last_msg_subq.c.last_time,
-                ),
-            )
             .outerjoin(
                 ConversationSettings,
                 and_(
@@ -102,20 +179,55 @@ class ConversationService:
                     ConversationSettings.user_id == user_uuid,
                 ),
             )
-            .where(
-                or_(
-                    Conversation.user1_id == user_uuid,
-                    Conversation.user2_id == user_uuid,
-                )
-            )
             .order_by(
-                ConversationSettings.is_pinned.desc().nullslast(),
-                last_msg_subq.c.last_time.desc().nullslast(),
+                page.c.pinned.desc(),
+                page.c.last_activity_at.desc(),
+                page.c.id.desc(),
+            )
+            .limit(limit + 1)
+            # The pointer columns are written with bulk UPDATEs
+            .execution_options(populate_existing=True)
+        )
+
+        if with_other_user:
+            other_user_id = case(
+                (Conversation.user1_id == user_uuid, Conversation.user2_id),
+                else_=Conversation.user1_id,
+            )
+            stmt = stmt.add_columns(User).join(User, User.id == other_user_id)
+
+        try:
+            result = await db.execute(stmt)
+        except SQLAlchemyError as e:
+            raise DatabaseException(str(e))
+
+        rows = list(result.all())
+
+        if len(rows) <= limit:
+            return rows, None
+
+        rows = rows[:limit]
+        last, is_pinned = rows[-1][0], bool(rows[-1][3])
+
+        return rows, encode_cursor(int(is_pinned), last.last_activity_at, last.id)
+
+    @staticmethod
+    async def list_partner_ids(db: AsyncSession, user_id: str | uuid.UUID):
+        user_uuid = await to_uuid(user_id)
+
+        stmt = select(Conversation.user1_id, Conversation.user2_id).where(
+            or_(
+                Conversation.user1_id == user_uuid,
+                Conversation.user2_id == user_uuid,
             )
         )
 
         result = await db.execute(stmt)
-        return result.all()
+
+        return {
+            str(user2_id if user1_id == user_uuid else user1_id)
+            for user1_id, user2_id in result.all()
+        }
 
     @staticmethod
     async def get_by_id(db: AsyncSession, conversation_id: str | uuid.UUID):
@@ -133,8 +245,9 @@ class ConversationService:
         user_uuid = await to_uuid(user_id)
         conversation_uuid = await to_uuid(conversation_id)
 
-        conversation = await ConversationService.get_by_id(
-            db=db, conversation_id=conversation_id
+        # The last-message pointer is written with bulk UPDATEs
+        conversation = await db.get(
+            Conversation, conversation_uuid, populate_existing=True
         )
         if not conversation:
             raise AppException("Conversation not found")
@@ -159,15 +272,6 @@ class ConversationService:
             db=db, conversation_id=conversation_id, user_id=user_uuid
         )
 
-        query = (
-            select(Message)
-            .where(Message.conversation_id == conversation_uuid)
-            .order_by(Message.sent_at.desc())
-            .limit(1)
-        )
-        result = await db.execute(query)
-        last_message = result.scalar_one_or_none()
-
         return {
             "conversation_id": str(conversation.id),
             "other_user": {
@@ -182,16 +286,8 @@ class ConversationService:
             "unread_count": unread or 0,
             "is_muted": settings.is_muted,
             "is_pinned": settings.is_pinned,
-            "last_message": (
-                None
-                if not last_message
-                else {
-                    "id": str(last_message.id),
-                    "sender_id": str(last_message.sender_id),
-                    "content": last_message.content,
-                    "sent_at": last_message.sent_at.isoformat(),
-                }
-            ),
+            # The pointer the inbox list reads, so both agree on the last message
+            "last_message": last_message_payload(conversation),
             "created_at": conversation.created_at.isoformat(),
             "updated_at": conversation.updated_at.isoformat(),
         }
@@ -1,8 +1,10 @@
 import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from app.models.conversation_settings_model import ConversationSettings
 from app.utils.uuid_util import to_uuid
+from app.websocket.state import notification_manager
 
 
 class ConversationSettingsService:
@@ -33,7 +35,15 @@ class ConversationSettingsService:
         )
 
         db.add(settings)
-        await db.commit()
+
+        try:
+            await db.commit()
+        except IntegrityError:
+            # Created concurrently; the unique index keeps a single row
+            await db.rollback()
+            result = await db.execute(stmt)
+            return result.scalar_one()
+
         await db.refresh(settings)
 
         return settings
@@ -48,11 +58,19 @@ class ConversationSettingsService:
         settings = await ConversationSettingsService.get_or_create(
             db=db, conversation_id=conversation_id, user_id=user_id
         )
+        if settings.is_muted == mute:
+            return settings
+
         settings.is_muted = mute
 
         await db.commit()
         await db.refresh(settings)
 
+        # The user's other devices
+        await notification_manager.send_inbox_delta(
+            str(settings.user_id), str(settings.conversation_id), is_muted=mute
+        )
+
         return settings
 
     @staticmethod
@@ -65,9 +83,16 @@ class ConversationSettingsService:
         settings = await ConversationSettingsService.get_or_create(
             db=db, conversation_id=conversation_id, user_id=user_id
         )
+        if settings.is_pinned == pin:
+            return settings
+
         settings.is_pinned = pin
 
         await db.commit()
         await db.refresh(settings)
 
+        await notification_manager.send_inbox_delta(
+            str(settings.user_id), str(settings.conversation_id), is_pinned=pin
+        )
+
         return settings
@@ -6,7 +6,7 @@ from datetime import datetime, UTC
 from app.models.friendship_model import Friendship, FriendshipStatus
 from app.core.exceptions import AppException, DatabaseException
 from app.utils.uuid_util import to_uuid
-from app.websocket.state import notification_manager
+from app.websocket.state import connection_manager, notification_manager
 
 
 class FriendService:
@@ -57,9 +57,9 @@ class FriendService:
                 {
                     "event": "notification",
                     "type": "friend_request",
-                    "from_user_id": str(requester_uuid),
-                    "friendship_id": str(friendship.id),
-                    "created_at": datetime.now(UTC).isoformat(),
+                    "from_user_id": requester_uuid,
+                    "friendship_id": friendship.id,
+                    "created_at": datetime.now(UTC),
                 },
             )
 
@@ -91,14 +91,18 @@ class FriendService:
             await db.commit()
             await db.refresh(friendship)
 
+            await connection_manager.broadcast_contact(
+                str(friendship.requester_id), str(friendship.receiver_id)
+            )
+
             await notification_manager.send_notifications(
                 str(friendship.requester_id),
                 {
                     "event": "notification",
                     "type": "friend_request",
-                    "from_user_id": str(friendship.requester_id),
-                    "friendship_id": str(friendship.id),
-                    "created_at": datetime.now(UTC).isoformat(),
+                    "from_user_id": friendship.requester_id,
+                    "friendship_id": friendship.id,
+                    "created_at": datetime.now(UTC),
                 },
             )
 
@@ -135,9 +139,9 @@ class FriendService:
                 {
                     "event": "notification",
                     "type": "friend_request",
-                    "from_user_id": str(friendship.receiver_id),
-                    "friendship_id": str(friendship.id),
-                    "created_at": datetime.now(UTC).isoformat(),
+                    "from_user_id": friendship.receiver_id,
+                    "friendship_id": friendship.id,
+                    "created_at": datetime.now(UTC),
                 },
             )
 
@@ -164,6 +168,27 @@ class FriendService:
         result = await db.execute(stmt)
         return result.scalars().all()
 
+    @staticmethod
+    async def list_friend_ids(db: AsyncSession, user_id: str | uuid.UUID):
+        user_uuid = await to_uuid(user_id)
+
+        stmt = select(Friendship.requester_id, Friendship.receiver_id).where(
+            and_(
+                Friendship.status == FriendshipStatus.accepted,
+                or_(
+                    Friendship.requester_id == user_uuid,
+                    Friendship.receiver_id == user_uuid,
+                ),
+            )
+        )
+
+        result = await db.execute(stmt)
+
+        return {
+            str(receiver_id if requester_id == user_uuid else requester_id)
+            for requester_id, receiver_id in result.all()
+        }
+
     @staticmethod
     async def list_pending(db: AsyncSession, user_id: str | uuid.UUID):
         user_uuid = await to_uuid(user_id)
@@ -1,17 +1,44 @@
 import uuid
 from datetime import datetime, UTC
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, and_, or_
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.models.message_model import Message, MessageStatus
-from app.models.conversation_model import Conversation
+from app.models.conversation_model import Conversation, PREVIEW_LENGTH
+from app.schemas.conversation_schema import (
+    last_message_payload,
+    message_preview_payload,
+)
 from app.services.unread_service import UnreadService
 from app.core.exceptions import AppException, DatabaseException
+from app.utils.cursor_util import decode_cursor, encode_cursor
+from app.utils.datetime_util import parse_timestamp
 from app.utils.uuid_util import to_uuid
+from app.websocket.recent_messages import message_entry
+from app.websocket.state import connection_manager, notification_manager
+
+# Upper bound for one page of history, whatever the client asks for
+MESSAGE_PAGE_MAX = 100
 
 
 class MessageService:
 
+    @staticmethod
+    async def _cache(msg: Message, new: bool = False):
+        await connection_manager.cache_message(
+            str(msg.conversation_id), message_entry(msg), new=new
+        )
+
+    @staticmethod
+    async def _push_inbox(msg: Message, **changes):
+        """Inbox delta for both members of the message's conversation."""
+
+        for user_id in (msg.sender_id, msg.receiver_id):
+            await notification_manager.send_inbox_delta(
+                str(user_id), str(msg.conversation_id), **changes
+            )
+
     @staticmethod
     async def can_user_access_conversation(
         db: AsyncSession, conversation: Conversation, user_id: str | uuid.UUID
@@ -19,6 +46,66 @@ class MessageService:
         user_uuid = await to_uuid(user_id)
         return conversation.user1_id == user_uuid or conversation.user2_id == user_uuid
 
+    @staticmethod
+    async def _repoint_last_message(db: AsyncSession, msg: Message) -> bool:
+        """
+        Refresh the conversation's last-message pointer after `msg` was edited
+        or deleted, before the caller commits. Older messages leave it alone.
+        Returns whether the pointer moved.
+        """
+
+        values: dict
+
+        if not msg.is_deleted:
+            values = {"last_message_preview": msg.content[:PREVIEW_LENGTH]}
+        else:
+            await db.flush()
+
+            # Fall back to the newest message still visible, via the partial
+            # index on undeleted messages
+            latest = await db.scalar(
+                select(Message)
+                .where(Message.conversation_id == msg.conversation_id)
+                .where(Message.is_deleted.is_(False))
+                .order_by(Message.seq.desc())
+                .limit(1)
+            )
+
+            values = {
+                "last_message_id": latest.id if latest else None,
+                "last_message_sender_id": latest.sender_id if latest else None,
+                "last_message_at": latest.sent_at if latest else None,
+                "last_message_preview": (
+                    latest.content[:PREVIEW_LENGTH] if latest else None
+                ),
+            }
+
+        repointed = await db.scalar(
+            update(Conversation)
+            .where(
+                Conversation.id == msg.conversation_id,
+                Conversation.last_message_id == msg.id,
+            )
+            .values(**values)
+            .returning(Conversation.id)
+            .execution_options(synchronize_session=False)
+        )
+
+        return repointed is not None
+
+    @staticmethod
+    async def _push_last_message(db: AsyncSession, msg: Message):
+        """After an edit or delete moved the pointer, push the new preview."""
+
+        conversation = await db.get(
+            Conversation, msg.conversation_id, populate_existing=True
+        )
+
+        if conversation is not None:
+            await MessageService._push_inbox(
+                msg, last_message=last_message_payload(conversation)
+            )
+
     @staticmethod
     async def send_message(
         db: AsyncSession,
@@ -38,8 +125,32 @@ class MessageService:
             if not content or content.strip() == "":
                 raise AppException("Message content cannot be empty")
 
+            message_uuid = uuid.uuid4()
+            sent_at = datetime.now(UTC)
+
+            # Row-locks the conversation until commit, so concurrent senders
+            # get consecutive numbers and a rollback gives its number back.
+            # The last-message pointer moves in the same statement.
+            seq = await db.scalar(
+                update(Conversation)
+                .where(Conversation.id == conv_uuid)
+                .values(
+                    last_seq=Conversation.last_seq + 1,
+                    last_message_id=message_uuid,
+                    last_message_sender_id=sender_uuid,
+                    last_message_at=sent_at,
+                    last_message_preview=content[:PREVIEW_LENGTH],
+                    last_activity_at=sent_at,
+                )
+                .returning(Conversation.last_seq)
+                .execution_options(synchronize_session=False)
+            )
+
             msg = Message(
+                id=message_uuid,
                 conversation_id=conv_uuid,
+                seq=seq,
+                sent_at=sent_at,
                 sender_id=sender_uuid,
                 receiver_id=receiver_uuid,
                 content=content,
@@ -49,6 +160,13 @@ class MessageService:
             db.add(msg)
             await db.commit()
             await db.refresh(msg)
+            await MessageService._cache(msg, new=True)
+            # Moves the conversation to the top of both inboxes
+            await MessageService._push_inbox(
+                msg,
+                last_message=message_preview_payload(msg),
+                last_activity_at=msg.sent_at.isoformat(),
+            )
             await UnreadService.increment(
                 db=db, conversation=conversation, receiver_id=receiver_uuid
             )
@@ -60,19 +178,85 @@ class MessageService:
 
     @staticmethod
     async def list_messages(
-        db: AsyncSession, conv_id: str | uuid.UUID, limit: int = 50
+        db: AsyncSession,
+        conv_id: str | uuid.UUID,
+        limit: int = 50,
+        before_seq: int | None = None,
+        after_seq: int | None = None,
     ):
+        """
+        One page of history, newest first.
+        Without a cursor it is the latest `limit` messages; `before_seq` pages
+        back from a message and `after_seq` forward from one. Every page is a
+        range scan on the (conversation_id, seq) index.
+        """
+
+        if before_seq is not None and after_seq is not None:
+            raise AppException("Use either before or after, not both")
+
         conv_uuid = await to_uuid(conv_id)
+        limit = max(1, min(limit, MESSAGE_PAGE_MAX))
 
-        stmt = (
-            select(Message)
-            .where(Message.conversation_id == conv_uuid)
-            .order_by(Message.sent_at)
-            .limit(limit)
+        stmt = select(Message).where(Message.conversation_id == conv_uuid)
+
+        if after_seq is not None:
+            stmt = stmt.where(Message.seq > after_seq).order_by(Message.seq)
+        else:
+            if before_seq is not None:
+                stmt = stmt.where(Message.seq < before_seq)
+
+            stmt = stmt.order_by(Message.seq.desc())
+
+        try:
+            result = await db.execute(stmt.limit(limit))
+        except SQLAlchemyError as e:
+            raise DatabaseException(str(e))
+
+        messages = list(result.scalars().all())
+
+        if after_seq is not None:
+            messages.reverse()
+
+        return messages
+
+    @staticmethod
+    async def list_messages_around(
+        db: AsyncSession,
+        conv_id: str | uuid.UUID,
+        message_id: str | uuid.UUID,
+        limit: int = 50,
+    ):
+        """The page centred on one message, for deep links; newest first."""
+
+        conv_uuid = await to_uuid(conv_id)
+        message_uuid = await to_uuid(message_id)
+        limit = max(1, min(limit, MESSAGE_PAGE_MAX))
+
+        try:
+            anchor = await db.scalar(
+                select(Message.seq).where(
+                    Message.id == message_uuid, Message.conversation_id == conv_uuid
+                )
+            )
+        except SQLAlchemyError as e:
+            raise DatabaseException(str(e))
+
+        if anchor is None:
+            raise AppException("Message not found")
+
+        # The anchor and the newer half, then the older half below it
+        newer = await MessageService.list_messages(
+            db, conv_id=conv_uuid, limit=limit - limit // 2, after_seq=anchor - 1
+        )
+        older = (
+            await MessageService.list_messages(
+                db, conv_id=conv_uuid, limit=limit // 2, before_seq=anchor
+            )
+            if limit > 1
+            else []
         )
 
-        result = await db.execute(stmt)
-        return result.scalars().all()
+        return newer + older
 
     @staticmethod
     async def mark_delivered(
@@ -97,6 +281,7 @@ class MessageService:
 
             await db.commit()
             await db.refresh(msg)
+            await MessageService._cache(msg)
             return msg
         except AppException:
             raise
@@ -126,6 +311,7 @@ class MessageService:
 
             await db.commit()
             await db.refresh(msg)
+            await MessageService._cache(msg)
             return msg
         except AppException:
             raise
@@ -158,8 +344,14 @@ class MessageService:
         msg.content = new_content
         msg.edited_at = datetime.now(UTC)
 
+        repointed = await MessageService._repoint_last_message(db, msg)
         await db.commit()
         await db.refresh(msg)
+        await MessageService._cache(msg)
+
+        if repointed:
+            await MessageService._push_last_message(db, msg)
+
         return msg
 
     @staticmethod
@@ -182,14 +374,109 @@ class MessageService:
         msg.is_deleted = True
         msg.edited_at = datetime.now(UTC)
 
+        repointed = await MessageService._repoint_last_message(db, msg)
         await db.commit()
         await db.refresh(msg)
+        await MessageService._cache(msg)
+
+        if repointed:
+            await MessageService._push_last_message(db, msg)
+
         return msg
 
     @staticmethod
     async def list_messages_since(
-        db: AsyncSession, user_id: str | uuid.UUID, timestamp: datetime
+        db: AsyncSession,
+        user_id: str | uuid.UUID,
+        timestamp: datetime | None = None,
+        cursor: str | None = None,
+        limit: int = 100,
     ):
-        stmt = select(Message).where(Message.sent_at > timestamp)
-        result = await db.execute(stmt)
-        return result.scalars().all()
+        """
+        One page of the messages a user missed since `timestamp`, across the
+        conversations they belong to, oldest first.
+        Returns the page and the cursor of the next one (None on the last
+        page). Pages are keyed on (sent_at, id) and read through the
+        (conversation_id, sent_at) index, so the cost follows what this user
+        missed rather than the size of the table.
+        """
+
+        user_uuid = await to_uuid(user_id)
+
+        conversation_ids = select(Conversation.id).where(
+            or_(Conversation.user1_id == user_uuid, Conversation.user2_id == user_uuid)
+        )
+
+        stmt = select(Message).where(Message.conversation_id.in_(conversation_ids))
+
+        if cursor:
+            sent_at, message_id = decode_cursor(cursor, size=2)
+            after_ts = parse_timestamp(sent_at)
+            after_id = await to_uuid(message_id)
+
+            stmt = stmt.where(
+                or_(
+                    Message.sent_at > after_ts,
+                    and_(Message.sent_at == after_ts, Message.id > after_id),
+                )
+            )
+        elif timestamp is not None:
+            stmt = stmt.where(Message.sent_at > timestamp)
+
+        stmt = stmt.order_by(Message.sent_at, Message.id).limit(limit + 1)
+
+        try:
+            result = await db.execute(stmt)
+            messages = list(result.scalars().all())
+        except SQLAlchemyError as e:
+            raise DatabaseException(str(e))
+
+        if len(messages) <= limit:
+            return messages, None
+
+        messages = messages[:limit]
+        last = messages[-1]
+
+        return messages, encode_cursor(last.sent_at, last.id)
+
+    @staticmethod
+    async def list_messages_after_seq(
+        db: AsyncSession,
+        user_id: str | uuid.UUID,
+        conversation_id: str | uuid.UUID,
+        after_seq: int,
+        limit: int = 100,
+    ):
+        """
+        Messages of one conversation numbered above `after_seq`, in order.
+        Returns the conversation's current last_seq alongside the page; it is
+        a range scan on the (conversation_id, seq) unique index.
+        """
+
+        user_uuid = await to_uuid(user_id)
+        conv_uuid = await to_uuid(conversation_id)
+
+        try:
+            conversation = await db.get(Conversation, conv_uuid, populate_existing=True)
+        except SQLAlchemyError as e:
+            raise DatabaseException(str(e))
+
+        if not conversation or user_uuid not in (
+            conversation.user1_id,
+            conversation.user2_id,
+        ):
+            raise AppException(f"Cannot resume conversation {conv_uuid}")
+
+        stmt = (
+            select(Message)
+            .where(Message.conversation_id == conv_uuid, Message.seq > after_seq)
+            .order_by(Message.seq)
+            .limit(limit)
+        )
+
+        try:
+            result = await db.execute(stmt)
+        except SQLAlchemyError as e:
+            raise DatabaseException(str(e))
+
+        return conversation.last_seq, list(result.scalars().all())
@@ -0,0 +1,99 @@
+import uuid
+from datetime import datetime, timedelta, UTC
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, or_, and_
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.models.conversation_model import Conversation
+from app.models.unread_model import ConversationUnread
+from app.models.conversation_settings_model import ConversationSettings
+from app.models.friendship_model import Friendship
+from app.core.exceptions import DatabaseException
+from app.utils.cursor_util import decode_cursor, encode_cursor
+from app.utils.datetime_util import parse_timestamp
+from app.utils.uuid_util import to_uuid
+
+# Past this many changed rows of one kind a full reload is cheaper than a delta
+SYNC_MAX_CHANGES = 500
+
+# Rows stamped just before a token was issued can commit just after it; each
+# sync reaches back this far, and clients apply rows as idempotent upserts
+SYNC_OVERLAP = timedelta(seconds=10)
+
+
+class SyncService:
+
+    @staticmethod
+    async def changes_since(
+        db: AsyncSession, user_id: str | uuid.UUID, token: str | None = None
+    ) -> dict:
+        """
+        The user's conversations, unread counters, settings and friendships
+        whose updated_at moved since `token` (everything when None), and the
+        token to pass next time.
+        Each kind is read with a range scan on its (owner, updated_at) index,
+        so the cost follows the number of changes rather than the account.
+        `reset` is set when one kind holds more than SYNC_MAX_CHANGES rows;
+        the lists are then empty and the client reloads in full before
+        syncing on from the new token.
+        """
+
+        user_uuid = await to_uuid(user_id)
+
+        # Taken before reading, so anything committed meanwhile is seen again
+        next_token = encode_cursor(datetime.now(UTC))
+        since = None
+
+        if token:
+            (issued_at,) = decode_cursor(token, size=1)
+            since = parse_timestamp(issued_at) - SYNC_OVERLAP
+
+        def changed(model, *owners):
+            stmt = select(model)
+
+            if since is None:
+                stmt = stmt.where(or_(*(owner == user_uuid for owner in owners)))
+            else:
+                # One (owner, updated_at) range per side, combined by the planner
+                stmt = stmt.where(
+                    or_(
+                        *(
+                            and_(owner == user_uuid, model.updated_at > since)
+                            for owner in owners
+                        )
+                    )
+                )
+
+            return (
+                stmt.order_by(model.updated_at, model.id)
+                .limit(SYNC_MAX_CHANGES + 1)
+                .execution_options(populate_existing=True)
+            )
+
+        queries = {
+            "conversations": changed(
+                Conversation, Conversation.user1_id, Conversation.user2_id
+            ),
+            "unread": changed(ConversationUnread, ConversationUnread.user_id),
+            "settings": changed(ConversationSettings, ConversationSettings.user_id),
+            "friendships": changed(
+                Friendship, Friendship.requester_id, Friendship.receiver_id
+            ),
+        }
+
+        changes: dict = {"token": next_token, "reset": False}
+
+        try:
+            for kind, stmt in queries.items():
+                result = await db.execute(stmt)
+                changes[kind] = list(result.scalars().all())
+        except SQLAlchemyError as e:
+            raise DatabaseException(str(e))
+
+        if any(len(changes[kind]) > SYNC_MAX_CHANGES for kind in queries):
+            changes["reset"] = True
+
+            for kind in queries:
+                changes[kind] = []
+
+        return changes
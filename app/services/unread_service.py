@@ -1,14 +1,24 @@
 import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 
 from app.models.conversation_model import Conversation
 from app.models.unread_model import ConversationUnread
 from app.utils.uuid_util import to_uuid
+from app.websocket.state import notification_manager
 
 
 class UnreadService:
 
+    @staticmethod
+    async def _push(entry: ConversationUnread):
+        await notification_manager.send_inbox_delta(
+            str(entry.user_id),
+            str(entry.conversation_id),
+            unread_count=entry.unread_count,
+        )
+
     @staticmethod
     async def ensure_entry(
         db: AsyncSession, conversation_id: str | uuid.UUID, user_id: str | uuid.UUID
@@ -31,7 +41,15 @@ class UnreadService:
         )
 
         db.add(entry)
-        await db.commit()
+
+        try:
+            await db.commit()
+        except IntegrityError:
+            # Created concurrently; the unique index keeps a single row
+            await db.rollback()
+            result = await db.execute(stmt)
+            return result.scalar_one()
+
         await db.refresh(entry)
         return entry
 
@@ -47,6 +65,7 @@ class UnreadService:
         entry.unread_count += 1
         await db.commit()
         await db.refresh(entry)
+        await UnreadService._push(entry)
         return entry
 
     @staticmethod
@@ -60,9 +79,14 @@ class UnreadService:
             db=db, conversation_id=conversation_uuid, user_id=user_uuid
         )
 
+        # Read receipts reset on every message; only a change is pushed
+        if entry.unread_count == 0:
+            return entry
+
         entry.unread_count = 0
         await db.commit()
         await db.refresh(entry)
+        await UnreadService._push(entry)
         return entry
 
     @staticmethod
@@ -1,4 +1,5 @@
 import uuid
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import select, or_
@@ -65,6 +66,23 @@ class UserService:
         except SQLAlchemyError as e:
             DatabaseException(str(e))
 
+    @staticmethod
+    async def update_last_seen(
+        db: AsyncSession, user_id: str | uuid.UUID, last_seen: datetime
+    ):
+        user_uuid = await to_uuid(user_id)
+
+        try:
+            user = await db.get(User, user_uuid)
+
+            if user:
+                user.last_seen = last_seen
+                await db.commit()
+
+            return user
+        except SQLAlchemyError as e:
+            raise DatabaseException(str(e))
+
     @staticmethod
     async def authenticate(db: AsyncSession, username_or_email: str, password: str):
         try:
@@ -0,0 +1,29 @@
+import base64
+from typing import List
+
+from app.core.exceptions import AppException
+from app.utils import json_util
+
+
+def encode_cursor(*parts) -> str:
+    """
+    Pack keyset values into an opaque, URL-safe cursor
+    Datetimes come back as ISO strings and UUIDs as their string form, so
+    callers parse the values they get from `decode_cursor`.
+    """
+
+    raw = json_util.dumps(list(parts)).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json_util.loads(raw)
+    except (TypeError, ValueError):
+        raise AppException("Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise AppException("Invalid cursor")
+
+    return values
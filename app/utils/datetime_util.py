@@ -0,0 +1,31 @@
+from datetime import datetime, UTC
+from app.core.exceptions import AppException
+
+
+def parse_timestamp(value) -> datetime:
+    """
+    Convert a client-supplied timestamp to an aware UTC datetime
+    Value can be:
+    - datetime
+    - integer or float milliseconds since the epoch (msgpack clients)
+    - ISO 8601 string, with or without the "T" separator
+    Naive values are taken to be UTC.
+    """
+
+    if isinstance(value, bool):
+        raise AppException(f"Invalid timestamp: {value}")
+
+    try:
+        if isinstance(value, datetime):
+            parsed = value
+        elif isinstance(value, (int, float)):
+            parsed = datetime.fromtimestamp(value / 1000, tz=UTC)
+        else:
+            parsed = datetime.fromisoformat(str(value))
+    except (TypeError, ValueError, OverflowError, OSError):
+        raise AppException(f"Invalid timestamp: {value}")
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+
+    return parsed.astimezone(UTC)
@@ -0,0 +1,39 @@
+import json
+import uuid
+from datetime import date, datetime
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None  # type: ignore
+
+
+def _default(value: Any):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload: Any) -> str:
+    """
+    Encode a payload to JSON text.
+    UUIDs and datetimes are encoded natively, so callers can pass model values
+    as they are instead of converting them with str() or isoformat().
+    """
+
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default).decode()
+
+    return json.dumps(payload, default=_default, separators=(",", ":"))
+
+
+def loads(data: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+
+    return json.loads(data)
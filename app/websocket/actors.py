@@ -0,0 +1,75 @@
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Tuple
+
+from app.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+Job = Callable[[], Awaitable[None]]
+
+
+class ConversationActors:
+    """
+    One lightweight actor per active conversation.
+    Jobs for the same conversation run one at a time in submission order, no
+    matter which socket or worker coroutine submitted them; different
+    conversations run in parallel. An actor exists only while it has work:
+    once its mailbox is empty its task ends and it is dropped from the
+    registry, so idle rooms cost nothing.
+    """
+
+    def __init__(self):
+        self._mailboxes: Dict[str, Deque[Tuple[Job, asyncio.Future]]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+        self.processed = 0
+        self.spawned = 0
+
+    async def run(self, conversation_id: str, job: Job):
+        """Queue `job` on the conversation's actor and wait for its result."""
+
+        done = asyncio.get_running_loop().create_future()
+        mailbox = self._mailboxes.get(conversation_id)
+
+        if mailbox is None:
+            mailbox = self._mailboxes[conversation_id] = deque()
+            self._tasks[conversation_id] = asyncio.create_task(
+                self._drain(conversation_id, mailbox)
+            )
+            self.spawned += 1
+
+        mailbox.append((job, done))
+
+        return await done
+
+    async def _drain(self, conversation_id: str, mailbox: Deque):
+        try:
+            while mailbox:
+                job, done = mailbox.popleft()
+
+                if done.cancelled():
+                    # The submitting socket went away before its turn
+                    continue
+
+                try:
+                    result = await job()
+                except Exception as e:
+                    if not done.cancelled():
+                        done.set_exception(e)
+                else:
+                    if not done.cancelled():
+                        done.set_result(result)
+
+                self.processed += 1
+        finally:
+            del self._mailboxes[conversation_id]
+            del self._tasks[conversation_id]
+
+    def stats(self) -> dict:
+        return {
+            "active": len(self._tasks),
+            "queued": sum(len(mailbox) for mailbox in self._mailboxes.values()),
+            "spawned": self.spawned,
+            "processed": self.processed,
+        }
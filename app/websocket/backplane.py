@@ -0,0 +1,210 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from app.utils.logging_util import get_logger
+from app.websocket.codecs import pack_envelope, unpack_envelope
+
+logger = get_logger(__name__)
+
+BackplaneHandler = Callable[[dict], Awaitable[None]]
+
+
+class Backplane:
+    """
+    Pub/sub bus the WebSocket managers publish through.
+    Every published message is delivered to the local subscribers of its
+    channel and, depending on the implementation, to every other worker.
+    """
+
+    # Whether other processes receive what this one publishes
+    distributed = False
+
+    def __init__(self):
+        self._handlers: Dict[str, List[BackplaneHandler]] = {}
+
+    def subscribe(self, channel: str, handler: BackplaneHandler):
+        self._handlers.setdefault(channel, []).append(handler)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def publish(self, channel: str, message: dict):
+        raise NotImplementedError
+
+    async def _dispatch(self, channel: str, message: dict):
+        for handler in self._handlers.get(channel, []):
+            try:
+                await handler(message)
+            except Exception:
+                logger.exception("Backplane handler failed on channel=%s", channel)
+
+
+class InProcessBackplane(Backplane):
+    """Delivers to subscribers in this process only (single worker)."""
+
+    async def publish(self, channel: str, message: dict):
+        await self._dispatch(channel, message)
+
+
+class UnixSocketBackplane(Backplane):
+    """
+    Brokerless backplane for workers on the same host.
+    Each worker binds a datagram socket inside a shared directory and
+    publishes by sending to every other socket found there.
+    """
+
+    distributed = True
+
+    MAX_DATAGRAM_BYTES = 256 * 1024
+    PEER_REFRESH_SECONDS = 1
+    SEND_TIMEOUT_SECONDS = 1
+    READ_RETRY_SECONDS = 0.1
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory = directory
+        self.path = os.path.join(
+            directory, f"{os.getpid()}-{uuid.uuid4().hex[:8]}.sock"
+        )
+
+        self._sock: Optional[socket.socket] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._peers: List[str] = []
+        self._peers_checked_at = 0.0
+
+        # Sends to peers whose receive buffer was full, finished in background
+        self._pending_sends: Set[asyncio.Task] = set()
+
+    async def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.MAX_DATAGRAM_BYTES)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.MAX_DATAGRAM_BYTES)
+        sock.bind(self.path)
+
+        self._sock = sock
+        self._reader = asyncio.create_task(self._read_loop())
+
+    async def stop(self):
+        if self._reader:
+            self._reader.cancel()
+            self._reader = None
+
+        for task in self._pending_sends:
+            task.cancel()
+
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    async def publish(self, channel: str, message: dict):
+        await self._dispatch(channel, message)
+
+        if self._sock is None:
+            return
+
+        data = pack_envelope({"channel": channel, "message": message})
+
+        if len(data) > self.MAX_DATAGRAM_BYTES:
+            logger.warning("Backplane message too large (%s bytes)", len(data))
+            return
+
+        for peer in self._current_peers():
+            try:
+                self._sock.sendto(data, peer)
+            except BlockingIOError:
+                # The peer is behind; never make the publisher wait for it
+                task = asyncio.create_task(self._send_later(data, peer))
+                self._pending_sends.add(task)
+                task.add_done_callback(self._pending_sends.discard)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # The worker that owned this socket is gone
+                self._forget_peer(peer)
+            except Exception:
+                logger.exception("Backplane send to %s failed", peer)
+
+    async def _send_later(self, data: bytes, peer: str):
+        sock = self._sock
+
+        if sock is None:
+            return
+
+        loop = asyncio.get_running_loop()
+
+        try:
+            await asyncio.wait_for(
+                loop.sock_sendto(sock, data, peer),
+                timeout=self.SEND_TIMEOUT_SECONDS,
+            )
+        except (ConnectionRefusedError, FileNotFoundError):
+            self._forget_peer(peer)
+        except Exception:
+            logger.warning("Dropping backplane message for stalled peer %s", peer)
+
+    def _current_peers(self) -> List[str]:
+        now = time.monotonic()
+
+        if now - self._peers_checked_at >= self.PEER_REFRESH_SECONDS:
+            self._peers = [
+                os.path.join(self.directory, name)
+                for name in os.listdir(self.directory)
+                if name.endswith(".sock")
+                and os.path.join(self.directory, name) != self.path
+            ]
+            self._peers_checked_at = now
+
+        return list(self._peers)
+
+    def _forget_peer(self, peer: str):
+        if peer in self._peers:
+            self._peers.remove(peer)
+
+        try:
+            os.unlink(peer)
+        except OSError:
+            pass
+
+    async def _read_loop(self):
+        loop = asyncio.get_running_loop()
+
+        while self._sock is not None:
+            try:
+                data, _ = await loop.sock_recvfrom(self._sock, self.MAX_DATAGRAM_BYTES)
+            except OSError:
+                if self._sock is None:
+                    break
+
+                # Keep the worker subscribed; a dead reader loses every event
+                logger.exception("Backplane receive failed")
+                await asyncio.sleep(self.READ_RETRY_SECONDS)
+                continue
+
+            try:
+                envelope = unpack_envelope(data)
+                channel, message = envelope["channel"], envelope["message"]
+            except Exception:
+                logger.warning("Dropping malformed backplane message")
+                continue
+
+            await self._dispatch(channel, message)
+
+
+def create_backplane(kind: str, path: str) -> Backplane:
+    if kind == "unix":
+        return UnixSocketBackplane(directory=path)
+
+    return InProcessBackplane()
@@ -0,0 +1,199 @@
+import json
+import uuid
+from datetime import date, datetime, UTC
+from typing import Any, Callable, Dict, List, Optional
+from fastapi import WebSocket
+
+from app.utils.json_util import dumps, loads
+
+try:
+    import msgpack  # type: ignore[import-untyped]
+except ImportError:  # pragma: no cover - msgpack is optional
+    msgpack = None  # type: ignore
+
+MSGPACK_SUBPROTOCOL = "phichat.msgpack.v1"
+
+# MessagePack extension type carrying a UUID as its 16 raw bytes
+UUID_EXT_TYPE = 1
+
+# Extension types used only between workers, where values must arrive with
+# their Python type so each worker can encode them for its own clients
+DATETIME_EXT_TYPE = 2
+DATE_EXT_TYPE = 3
+
+
+class Codec:
+    name: str = ""
+    subprotocol: Optional[str] = None
+    binary: bool = False
+
+    def encode(self, payload: Any) -> str | bytes:
+        raise NotImplementedError
+
+    def decode(self, data: str | bytes) -> Any:
+        raise NotImplementedError
+
+    def join(self, frames: List[Any]) -> str | bytes:
+        """Combine already-encoded frames into one array frame, keeping order."""
+
+        raise NotImplementedError
+
+
+class JsonCodec(Codec):
+    name = "json"
+
+    def encode(self, payload: Any) -> str:
+        return dumps(payload)
+
+    def decode(self, data: str | bytes) -> Any:
+        return loads(data)
+
+    def join(self, frames: List[Any]) -> str:
+        return "[" + ",".join(frames) + "]"
+
+
+def _msgpack_default(value: Any):
+    if isinstance(value, uuid.UUID):
+        return msgpack.ExtType(UUID_EXT_TYPE, value.bytes)
+
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=UTC)
+
+        # Milliseconds since the Unix epoch
+        return int(value.timestamp() * 1000)
+
+    if isinstance(value, date):
+        return value.isoformat()
+
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+def _msgpack_ext_hook(code: int, data: bytes):
+    if code == UUID_EXT_TYPE:
+        return uuid.UUID(bytes=data)
+
+    return msgpack.ExtType(code, data)
+
+
+class MsgpackCodec(Codec):
+    """
+    Binary codec: UUIDs travel as 16-byte extension values and datetimes as
+    integer milliseconds since the epoch.
+    """
+
+    name = "msgpack"
+    subprotocol = MSGPACK_SUBPROTOCOL
+    binary = True
+
+    def encode(self, payload: Any) -> bytes:
+        return msgpack.packb(payload, default=_msgpack_default)
+
+    def decode(self, data: str | bytes) -> Any:
+        if isinstance(data, str):
+            data = data.encode()
+
+        return msgpack.unpackb(data, ext_hook=_msgpack_ext_hook)
+
+    def join(self, frames: List[Any]) -> bytes:
+        count = len(frames)
+
+        if count < 16:
+            header = bytes([0x90 | count])
+        elif count < 2**16:
+            header = b"\xdc" + count.to_bytes(2, "big")
+        else:
+            header = b"\xdd" + count.to_bytes(4, "big")
+
+        return header + b"".join(frames)
+
+
+JSON_CODEC = JsonCodec()
+MSGPACK_CODEC = MsgpackCodec() if msgpack is not None else None
+
+
+def negotiate_codec(websocket: WebSocket) -> Codec:
+    """Pick the codec from the client's Sec-WebSocket-Protocol offer."""
+
+    requested = websocket.scope.get("subprotocols") or []
+
+    if MSGPACK_CODEC is not None and MSGPACK_SUBPROTOCOL in requested:
+        return MSGPACK_CODEC
+
+    return JSON_CODEC
+
+
+def _envelope_default(value: Any):
+    if isinstance(value, uuid.UUID):
+        return msgpack.ExtType(UUID_EXT_TYPE, value.bytes)
+
+    if isinstance(value, datetime):
+        return msgpack.ExtType(DATETIME_EXT_TYPE, value.isoformat().encode())
+
+    if isinstance(value, date):
+        return msgpack.ExtType(DATE_EXT_TYPE, value.isoformat().encode())
+
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+def _envelope_ext_hook(code: int, data: bytes):
+    if code == UUID_EXT_TYPE:
+        return uuid.UUID(bytes=data)
+
+    if code == DATETIME_EXT_TYPE:
+        return datetime.fromisoformat(data.decode())
+
+    if code == DATE_EXT_TYPE:
+        return date.fromisoformat(data.decode())
+
+    return msgpack.ExtType(code, data)
+
+
+# Tagged objects used by the JSON fallback when msgpack is not installed
+_JSON_TAGS: Dict[str, Callable[[str], Any]] = {
+    "$uuid": uuid.UUID,
+    "$datetime": datetime.fromisoformat,
+    "$date": date.fromisoformat,
+}
+
+
+def _json_envelope_default(value: Any):
+    if isinstance(value, uuid.UUID):
+        return {"$uuid": str(value)}
+
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+def _json_envelope_hook(obj: dict):
+    if len(obj) == 1:
+        tag, value = next(iter(obj.items()))
+
+        if tag in _JSON_TAGS:
+            return _JSON_TAGS[tag](value)
+
+    return obj
+
+
+def pack_envelope(envelope: dict) -> bytes:
+    """
+    Serialize a backplane envelope so UUIDs and datetimes keep their type.
+    The receiving worker then encodes them for each client's own codec.
+    """
+
+    if msgpack is not None:
+        return msgpack.packb(envelope, default=_envelope_default)
+
+    return json.dumps(envelope, default=_json_envelope_default).encode()
+
+
+def unpack_envelope(data: bytes) -> dict:
+    if msgpack is not None:
+        return msgpack.unpackb(data, ext_hook=_envelope_ext_hook)
+
+    return json.loads(data, object_hook=_json_envelope_hook)
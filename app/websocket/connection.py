@@ -0,0 +1,504 @@
+import asyncio
+import enum
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+from fastapi import WebSocket, WebSocketDisconnect
+
+from app.utils.logging_util import get_logger
+from app.websocket.codecs import Codec, JSON_CODEC
+
+logger = get_logger(__name__)
+
+
+class OverflowPolicy(str, enum.Enum):
+    drop_oldest = "drop_oldest"
+    drop_low_value = "drop_low_value"
+    disconnect = "disconnect"
+
+
+# Application close code sent to clients that cannot keep up
+SLOW_CONSUMER_CLOSE_CODE = 4008
+
+# Application close code sent to clients that stopped answering pings
+HEARTBEAT_TIMEOUT_CLOSE_CODE = 4009
+
+# Close code reported to the reader when the socket went away without one
+ABNORMAL_CLOSE_CODE = 1006
+
+# Application-level heartbeat frames, answered inside `Connection.receive`
+PING_EVENT = "ping"
+PONG_EVENT = "pong"
+
+
+class Priority(enum.IntEnum):
+    """Outbound classes; a lower value is always written first."""
+
+    message = 0
+    receipt = 1
+    ephemeral = 2
+
+
+# Events outranked by chat messages; anything not listed is a message
+EVENT_PRIORITIES = {
+    "message_delivered": Priority.receipt,
+    "message_read": Priority.receipt,
+    "unread_update": Priority.receipt,
+    "typing": Priority.ephemeral,
+    "presence": Priority.ephemeral,
+    PING_EVENT: Priority.ephemeral,
+    PONG_EVENT: Priority.ephemeral,
+}
+
+# State events where only the newest frame per key is worth delivering
+SUPERSEDE_KEYS = {
+    "typing": ("conversation_id", "user_id"),
+    "presence": ("user_id",),
+    PING_EVENT: (),
+    PONG_EVENT: (),
+}
+
+
+class Frame(NamedTuple):
+    event: str
+    data: str | bytes
+    priority: Priority = Priority.message
+    key: Optional[Tuple] = None
+
+
+def encode_frame(message: dict, codec: Codec = JSON_CODEC) -> Frame:
+    """Serialize a payload once so it can be queued on any number of sockets."""
+
+    event = str(message.get("event"))
+    key_fields = SUPERSEDE_KEYS.get(event)
+    key = None
+
+    if key_fields is not None:
+        key = (event, *(str(message.get(field)) for field in key_fields))
+
+    return Frame(
+        event=event,
+        data=codec.encode(message),
+        priority=EVENT_PRIORITIES.get(event, Priority.message),
+        key=key,
+    )
+
+
+class FrameCache:
+    """Encodes a broadcast payload at most once per codec in use."""
+
+    def __init__(self, message: dict):
+        self.message = message
+        self._frames: Dict[str, Frame] = {}
+
+    def for_codec(self, codec: Codec) -> Frame:
+        frame = self._frames.get(codec.name)
+
+        if frame is None:
+            frame = encode_frame(self.message, codec)
+            self._frames[codec.name] = frame
+
+        return frame
+
+
+# Bounds for the opt-in flush window, in milliseconds
+MIN_COALESCE_MS = 2
+MAX_COALESCE_MS = 10
+
+
+def requested_coalesce_window(websocket: WebSocket) -> float:
+    """
+    Clients opt in to coalescing with `?coalesce_ms=N`; frames produced within
+    that window are then delivered together as one array frame.
+    Returns the window in seconds, or 0 when coalescing is off.
+    """
+
+    try:
+        requested = int(websocket.query_params.get("coalesce_ms") or 0)
+    except ValueError:
+        return 0
+
+    if requested <= 0:
+        return 0
+
+    return min(max(requested, MIN_COALESCE_MS), MAX_COALESCE_MS) / 1000
+
+
+def requested_heartbeat(websocket: WebSocket) -> bool:
+    """
+    Clients that answer `{"event": "ping"}` opt in with `?heartbeat=1`.
+    Everyone else relies on protocol-level ping/pong from the server.
+    """
+
+    return websocket.query_params.get("heartbeat") in ("1", "true")
+
+
+class Connection:
+    """
+    A WebSocket with a bounded outbound queue drained by its own writer task.
+    Senders only enqueue, so a stalled client never blocks the coroutine that
+    produced the event.
+    Frames are queued per `Priority` and the writer always serves the highest
+    class first, so typing and presence bursts cannot delay chat messages.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        user_id: str,
+        max_queue: int = 256,
+        overflow_policy: OverflowPolicy = OverflowPolicy.drop_low_value,
+        send_timeout: float = 5,
+        on_close: Optional[Callable[["Connection"], None]] = None,
+        codec: Codec = JSON_CODEC,
+        coalesce_window: float = 0,
+        heartbeat: bool = False,
+    ):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.codec = codec
+        self.coalesce_window = coalesce_window
+
+        # Whether the client speaks the application-level ping/pong, and can
+        # therefore be reaped when it stops answering
+        self.heartbeat = heartbeat
+        self.max_queue = max_queue
+        self.overflow_policy = overflow_policy
+        self.send_timeout = send_timeout
+
+        # Called once when the connection closes; a gateway socket is shared
+        # by both managers, so each of them registers here
+        self._close_callbacks: List[Callable[["Connection"], None]] = []
+
+        if on_close:
+            self._close_callbacks.append(on_close)
+
+        # One FIFO per priority class, indexed by `Priority`. Entries carry
+        # their enqueue number, so a coalesced batch keeps arrival order
+        self.queues: List[Deque[Tuple[int, Frame]]] = [deque() for _ in Priority]
+        self.depth = 0
+        self._enqueued = 0
+
+        # supersede key -> newest frame for it; the queued frame only keeps
+        # its place in line
+        self._latest: Dict[Tuple, Frame] = {}
+
+        self.closed = False
+        self.close_code = ABNORMAL_CLOSE_CODE
+
+        # Monotonic time of the last inbound frame, read by the heartbeat
+        self.last_seen = time.monotonic()
+
+        # Counters for spotting slow consumers
+        self.sent_count = 0
+        self.dropped_count = 0
+        self.overflow_count = 0
+        self.max_depth = 0
+        self.batch_count = 0
+        self.superseded_count = 0
+
+        self._ready = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+
+        # Send deadline without a timer per send: the watchdog fires at most
+        # once per `send_timeout` while the writer is busy
+        self._send_started = 0.0
+        self._watchdog: Optional[asyncio.TimerHandle] = None
+        self._send_timed_out = False
+
+        # Task currently blocked in `receive`, woken up when the connection
+        # is closed from elsewhere (reaper, slow consumer)
+        self._receiver: Optional[asyncio.Task] = None
+        self._interrupted = False
+
+    def add_close_callback(self, callback: Callable[["Connection"], None]):
+        self._close_callbacks.append(callback)
+
+    def start(self):
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._run())
+
+    def send(self, message: dict) -> bool:
+        return self.send_frame(encode_frame(message, self.codec))
+
+    def send_frame(self, frame: Frame) -> bool:
+        """Queue a frame for delivery. Returns False if it was dropped."""
+
+        if self.closed:
+            return False
+
+        if frame.key is not None and frame.key in self._latest:
+            # Still waiting to be written; replace the stale state in place
+            self._latest[frame.key] = frame
+            self.superseded_count += 1
+            return True
+
+        if self.depth >= self.max_queue and not self._make_room(frame):
+            return False
+
+        self.queues[frame.priority].append((self._enqueued, frame))
+        self._enqueued += 1
+        self.depth += 1
+        self.max_depth = max(self.max_depth, self.depth)
+
+        if frame.key is not None:
+            self._latest[frame.key] = frame
+
+        self._ready.set()
+
+        return True
+
+    def pending(self) -> List[Frame]:
+        """Queued frames in the order the writer will send them."""
+
+        return [
+            self._latest.get(frame.key, frame) if frame.key is not None else frame
+            for queue in self.queues
+            for _, frame in queue
+        ]
+
+    def _pop(self, priority: int) -> Tuple[int, Frame]:
+        order, frame = self.queues[priority].popleft()
+        self.depth -= 1
+
+        if frame.key is not None:
+            frame = self._latest.pop(frame.key, frame)
+
+        return order, frame
+
+    def _pop_next(self) -> Tuple[int, Frame]:
+        for priority, queue in enumerate(self.queues):
+            if queue:
+                return self._pop(priority)
+
+        raise IndexError("pop from an empty connection queue")
+
+    def _lowest_queued(self) -> int:
+        for priority in reversed(range(len(self.queues))):
+            if self.queues[priority]:
+                return priority
+
+        raise IndexError("connection queue is empty")
+
+    def _make_room(self, frame: Frame) -> bool:
+        self.overflow_count += 1
+
+        if self.overflow_policy == OverflowPolicy.disconnect:
+            self.dropped_count += 1
+            logger.warning(
+                "Disconnecting slow consumer user=%s depth=%s",
+                self.user_id,
+                self.depth,
+            )
+            asyncio.create_task(self.close(code=SLOW_CONSUMER_CLOSE_CODE))
+            return False
+
+        lowest = self._lowest_queued()
+
+        if self.overflow_policy == OverflowPolicy.drop_low_value:
+            if frame.priority > lowest:
+                # Everything already queued outranks the new frame
+                self.dropped_count += 1
+                return False
+
+        # Shed the oldest frame of the least important class waiting
+        self._pop(lowest)
+        self.dropped_count += 1
+        return True
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+
+        try:
+            while not self.closed:
+                if not self.depth:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+
+                data = await self._next_payload()
+
+                if data is None:
+                    continue
+
+                if isinstance(data, bytes):
+                    send = self.websocket.send_bytes(data)
+                else:
+                    send = self.websocket.send_text(data)
+
+                self._send_started = loop.time()
+
+                if self._watchdog is None:
+                    self._watchdog = loop.call_at(
+                        self._send_started + self.send_timeout,
+                        self._check_send_deadline,
+                    )
+
+                await send
+                self._send_started = 0.0
+                self.sent_count += 1
+        except asyncio.CancelledError:
+            if self._send_timed_out:
+                asyncio.current_task().uncancel()  # type: ignore
+                self.close_code = SLOW_CONSUMER_CLOSE_CODE
+                await self._close_socket(code=SLOW_CONSUMER_CLOSE_CODE)
+        except Exception:
+            self.close_code = SLOW_CONSUMER_CLOSE_CODE
+            await self._close_socket(code=SLOW_CONSUMER_CLOSE_CODE)
+        finally:
+            if self._watchdog is not None:
+                self._watchdog.cancel()
+                self._watchdog = None
+
+            self._mark_closed()
+
+    def _check_send_deadline(self):
+        self._watchdog = None
+
+        if self.closed or not self._send_started or self._writer is None:
+            return
+
+        loop = asyncio.get_running_loop()
+        deadline = self._send_started + self.send_timeout
+
+        if loop.time() < deadline:
+            # A later send is in flight; check it at its own deadline
+            self._watchdog = loop.call_at(deadline, self._check_send_deadline)
+            return
+
+        self._send_timed_out = True
+        self._writer.cancel()
+
+    async def _next_payload(self) -> Optional[str | bytes]:
+        if not self.coalesce_window:
+            return self._pop_next()[1].data
+
+        # Let the rest of the burst arrive, then send it as one frame
+        await asyncio.sleep(self.coalesce_window)
+
+        # Priority picks what goes out first; within the batch the frames
+        # keep the order they were sent in
+        entries = sorted(
+            (self._pop_next() for _ in range(self.depth)), key=lambda e: e[0]
+        )
+        frames = [frame.data for _, frame in entries]
+
+        if self.closed or not frames:
+            # Closed while waiting; the queue was already discarded
+            return None
+
+        if len(frames) == 1:
+            return frames[0]
+
+        self.batch_count += 1
+        return self.codec.join(frames)
+
+    def touch(self):
+        self.last_seen = time.monotonic()
+
+    async def receive(self) -> Any:
+        """
+        Read the next inbound frame and decode it with the negotiated codec.
+        Heartbeat frames are handled here and never reach the caller.
+        """
+
+        while True:
+            payload = self.codec.decode(await self._receive_raw())
+            self.touch()
+
+            event = payload.get("event") if isinstance(payload, dict) else None
+
+            if event in (PING_EVENT, PONG_EVENT):
+                # A client that sends heartbeat frames understands ours too
+                self.heartbeat = True
+
+                if event == PING_EVENT:
+                    self.send({"event": PONG_EVENT})
+
+                continue
+
+            return payload
+
+    async def _receive_raw(self) -> str | bytes:
+        if self.closed:
+            raise WebSocketDisconnect(self.close_code)
+
+        self._receiver = asyncio.current_task()
+
+        try:
+            message = await self.websocket.receive()
+        except asyncio.CancelledError:
+            if not self._interrupted:
+                raise
+
+            # Cancelled by `_mark_closed`, not by the caller
+            self._receiver.uncancel()  # type: ignore
+            raise WebSocketDisconnect(self.close_code)
+        finally:
+            self._receiver = None
+
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+
+        data = message.get("bytes")
+
+        if data is None:
+            data = message.get("text") or ""
+
+        return data
+
+    def stop(self):
+        """Stop the writer without touching the socket (it is already gone)."""
+
+        self._mark_closed()
+
+        if self._writer and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+        self.stop()
+        await self._close_socket(code=code)
+
+    async def _close_socket(self, code: int):
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
+
+    def _mark_closed(self):
+        if self.closed:
+            return
+
+        self.closed = True
+
+        for queue in self.queues:
+            queue.clear()
+
+        self._latest.clear()
+        self.depth = 0
+
+        # A half-open socket never delivers a disconnect, so release the
+        # endpoint blocked on it and let its cleanup run
+        receiver = self._receiver
+
+        if receiver is not None and receiver is not asyncio.current_task():
+            self._interrupted = True
+            receiver.cancel()
+
+        for callback in self._close_callbacks:
+            callback(self)
+
+    def stats(self) -> dict:
+        return {
+            "user_id": self.user_id,
+            "codec": self.codec.name,
+            "queue_depth": self.depth,
+            "max_depth": self.max_depth,
+            "sent": self.sent_count,
+            "dropped": self.dropped_count,
+            "overflows": self.overflow_count,
+            "batches": self.batch_count,
+            "superseded": self.superseded_count,
+            "idle_seconds": round(time.monotonic() - self.last_seen, 3),
+        }
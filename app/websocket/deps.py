@@ -1,12 +1,16 @@
+from typing import Callable
 from fastapi import WebSocket, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.utils.jwt_util import decode_access_token
 from app.services.user_service import UserService
-from app.database.connection import get_db
+from app.database.connection import get_session_factory
 from app.core.exceptions import UnauthorizedException
 
 
-async def get_current_user_ws(websocket: WebSocket, db: AsyncSession = Depends(get_db)):
+async def get_current_user_ws(
+    websocket: WebSocket,
+    sessions: Callable[[], AsyncSession] = Depends(get_session_factory),
+):
     token = websocket.query_params.get("token")
 
     if not token:
@@ -19,7 +23,9 @@ async def get_current_user_ws(websocket: WebSocket, db: AsyncSession = Depends(g
 
     user_id = payload["sub"]
 
-    user = await UserService.get_user_by_id(db, user_id=user_id)
+    # Released before the socket is accepted
+    async with sessions() as db:
+        user = await UserService.get_user_by_id(db, user_id=user_id)
 
     if not user:
         raise UnauthorizedException("User not found")
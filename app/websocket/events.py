@@ -1,7 +1,10 @@
+from typing import Awaitable, Callable, Dict, Optional
 from fastapi import WebSocket
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.conversation_model import Conversation
 from app.models.user_model import User
+from app.core.exceptions import AppException
+from app.utils.logging_util import get_logger
 from app.websocket.manager import ConnectionManager
 from app.websocket.handlers.typing_handler import (
     handle_typing_start,
@@ -16,44 +19,120 @@ from app.websocket.handlers.editing_handler import (
     handle_delete_message,
     handle_edit_message,
 )
+from app.websocket.handlers.reconnect_handler import handle_reconnect
 
+logger = get_logger(__name__)
 
-event_handlers = {
+event_handlers: Dict[str, Callable[..., Awaitable[None]]] = {
     "typing_start": handle_typing_start,
     "typing_stop": handle_typing_stop,
     "send_message": handle_send_message,
     "message_delivered": handle_message_delivered,
     "message_read": handle_message_read,
-    "message_edit": handle_delete_message,
-    "message_delete": handle_edit_message,
+    "message_edit": handle_edit_message,
+    "message_delete": handle_delete_message,
+    "reconnect": handle_reconnect,
 }
 
+# Handlers that never touch the database; they run as soon as they are read
+IMMEDIATE_EVENTS = frozenset({"typing_start", "typing_stop"})
+
+# Events about one existing message, which only need ordering per message
+MESSAGE_EVENTS = frozenset(
+    {"message_delivered", "message_read", "message_edit", "message_delete"}
+)
+
+
+def event_lane(event_name: str, data: dict, conversation_id: str) -> Optional[tuple]:
+    """Ordering key for `EventPipeline`; None runs the event immediately."""
+
+    if event_name in IMMEDIATE_EVENTS:
+        return None
+
+    if event_name in MESSAGE_EVENTS and data.get("message_id"):
+        return ("message", str(data.get("message_id")))
+
+    return ("conversation", conversation_id)
+
 
 async def dispatch_event(
     event_name: str,
     data: dict,
     websocket: WebSocket,
     user: User,
-    conversation: Conversation,
-    conversation_id: str,
+    conversation: Optional[Conversation],
+    conversation_id: Optional[str],
     manager: ConnectionManager,
-    db: AsyncSession,
+    db: Optional[AsyncSession],
 ):
     handler = event_handlers.get(event_name)
 
     if not handler:
-        await websocket.send_json(
-            {"event": "error", "message": f"Unknown event: {event_name}"}
+        await manager.send_to_socket(
+            websocket, {"event": "error", "message": f"Unknown event: {event_name}"}
+        )
+
+        return
+
+    try:
+        await handler(
+            data=data,
+            websocket=websocket,
+            user=user,
+            conversation=conversation,
+            conversation_id=conversation_id,
+            manager=manager,
+            db=db,
         )
+    except Exception as e:
+        if db is not None:
+            await db.rollback()
 
+        if isinstance(e, AppException):
+            message = e.message
+        else:
+            logger.exception("WebSocket event %s failed", event_name)
+            message = f"Could not process {event_name}"
+
+        await manager.send_to_socket(websocket, {"event": "error", "message": message})
+
+
+async def run_event(
+    event_name: str,
+    data: dict,
+    websocket: WebSocket,
+    user: User,
+    conversation: Optional[Conversation],
+    conversation_id: Optional[str],
+    manager: ConnectionManager,
+    sessions: Callable[[], AsyncSession],
+):
+    """
+    Dispatch one event on its own short-lived session, returned to the pool
+    as soon as the handler finishes. DB-free events never check one out.
+    """
+
+    if event_name in IMMEDIATE_EVENTS:
+        await dispatch_event(
+            event_name,
+            data,
+            websocket,
+            user,
+            conversation,
+            conversation_id,
+            manager,
+            None,
+        )
         return
 
-    await handler(
-        data=data,
-        websocket=websocket,
-        user=user,
-        conversation=conversation,
-        conversation_id=conversation_id,
-        manager=manager,
-        db=db,
-    )
+    async with sessions() as db:
+        await dispatch_event(
+            event_name,
+            data,
+            websocket,
+            user,
+            conversation,
+            conversation_id,
+            manager,
+            db,
+        )
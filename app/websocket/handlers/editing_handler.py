@@ -28,18 +28,17 @@ async def handle_edit_message(
         message={
             "event": "message_updated",
             "data": {
-                "id": str(msg.id),
+                "id": msg.id,
+                "seq": msg.seq,
                 "content": msg.content,
-                "edited_at": msg.edited_at.isoformat(),
+                "edited_at": msg.edited_at,
             },
         },
     )
 
     receiver_id_str = str(msg.receiver_id)
-    conversation_room = manager.conversations.get(conversation_id, set())
-    receiver_is_in_room = any(
-        ws in conversation_room
-        for ws in manager.active_users.get(receiver_id_str, set())
+    receiver_is_in_room = manager.is_user_in_conversation(
+        receiver_id_str, conversation_id
     )
 
     if not receiver_is_in_room:
@@ -49,9 +48,9 @@ async def handle_edit_message(
                 "event": "notification",
                 "type": "message_edit",
                 "conversation_id": conversation_id,
-                "from_user_id": str(user.id),
+                "from_user_id": user.id,
                 "preview": msg.content,
-                "sent_at": msg.sent_at.isoformat(),
+                "sent_at": msg.sent_at,
             },
         )
 
@@ -73,14 +72,15 @@ async def handle_delete_message(
 
     await manager.broadcast_to_conversation(
         conversation_id=conversation_id,
-        message={"event": "message_deleted", "data": {"id": str(msg.id)}},
+        message={
+            "event": "message_deleted",
+            "data": {"id": msg.id, "seq": msg.seq},
+        },
     )
 
     receiver_id_str = str(msg.receiver_id)
-    conversation_room = manager.conversations.get(conversation_id, set())
-    receiver_is_in_room = any(
-        ws in conversation_room
-        for ws in manager.active_users.get(receiver_id_str, set())
+    receiver_is_in_room = manager.is_user_in_conversation(
+        receiver_id_str, conversation_id
     )
 
     if not receiver_is_in_room:
@@ -90,8 +90,8 @@ async def handle_delete_message(
                 "event": "notification",
                 "type": "message_delete",
                 "conversation_id": conversation_id,
-                "from_user_id": str(user.id),
+                "from_user_id": user.id,
                 "preview": msg.content,
-                "sent_at": msg.sent_at.isoformat(),
+                "sent_at": msg.sent_at,
             },
         )
@@ -37,19 +37,18 @@ async def handle_send_message(
         {
             "event": "new_message",
             "data": {
-                "id": str(msg.id),
-                "sender_id": str(msg.sender_id),
-                "receiver_id": receiver_id_str,
+                "id": msg.id,
+                "seq": msg.seq,
+                "sender_id": msg.sender_id,
+                "receiver_id": msg.receiver_id,
                 "content": msg.content,
-                "sent_at": str(msg.sent_at),
+                "sent_at": msg.sent_at,
             },
         },
     )
 
-    conversation_room = manager.conversations.get(conversation_id, set())
-    receiver_is_in_room = any(
-        ws in conversation_room
-        for ws in manager.active_users.get(receiver_id_str, set())
+    receiver_is_in_room = manager.is_user_in_conversation(
+        receiver_id_str, conversation_id
     )
 
     if not receiver_is_in_room:
@@ -59,9 +58,9 @@ async def handle_send_message(
                 "event": "notification",
                 "type": "message",
                 "conversation_id": conversation_id,
-                "from_user_id": str(user.id),
+                "from_user_id": user.id,
                 "preview": msg.content,
-                "sent_at": msg.sent_at.isoformat(),
+                "sent_at": msg.sent_at,
             },
         )
 
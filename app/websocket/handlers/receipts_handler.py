@@ -27,7 +27,11 @@ async def handle_message_delivered(
         conversation_id=conversation_id,
         message={
             "event": "message_delivered",
-            "data": {"message_id": str(msg.id), "delivered_at": str(msg.delivered_at)},
+            "data": {
+                "message_id": msg.id,
+                "seq": msg.seq,
+                "delivered_at": msg.delivered_at,
+            },
         },
     )
 
@@ -51,7 +55,11 @@ async def handle_message_read(
         conversation_id=conversation_id,
         message={
             "event": "message_read",
-            "data": {"message_id": str(msg.id), "read_at": str(msg.read_at)},
+            "data": {
+                "message_id": msg.id,
+                "seq": msg.seq,
+                "read_at": msg.read_at,
+            },
         },
     )
 
@@ -65,10 +73,8 @@ async def handle_message_read(
     )
 
     receiver_id_str = str(msg.receiver_id)
-    conversation_room = manager.conversations.get(conversation_id, set())
-    receiver_is_in_room = any(
-        ws in conversation_room
-        for ws in manager.active_users.get(receiver_id_str, set())
+    receiver_is_in_room = manager.is_user_in_conversation(
+        receiver_id_str, conversation_id
     )
 
     if not receiver_is_in_room:
@@ -78,8 +84,8 @@ async def handle_message_read(
                 "event": "notification",
                 "type": "message_read",
                 "conversation_id": conversation_id,
-                "from_user_id": str(user.id),
+                "from_user_id": user.id,
                 "preview": msg.content,
-                "sent_at": msg.sent_at.isoformat(),
+                "sent_at": msg.sent_at,
             },
         )
@@ -1,42 +1,200 @@
-from datetime import datetime
+from typing import Optional
 from fastapi import WebSocket
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.conversation_model import Conversation
 from app.models.user_model import User
+from app.core.exceptions import AppException
 from app.websocket.manager import ConnectionManager
+from app.websocket.recent_messages import message_entry
 from app.services.message_service import MessageService
 from app.services.unread_service import UnreadService
+from app.utils.datetime_util import parse_timestamp
 from app.utils.uuid_util import to_uuid
 
+# Messages per frame, and frames per reconnect before the client has to ask
+# for the rest
+CATCH_UP_PAGE_SIZE = 100
+CATCH_UP_MAX_PAGES = 10
+
+
+MISSED_MESSAGE_FIELDS = (
+    "id",
+    "conversation_id",
+    "seq",
+    "content",
+    "sender_id",
+    "sent_at",
+)
+
+
+def _missed_message(entry: dict) -> dict:
+    return {field: entry[field] for field in MISSED_MESSAGE_FIELDS}
+
 
 async def handle_reconnect(
     data: dict,
     websocket: WebSocket,
     user: User,
-    conversation: Conversation,
-    conversation_id: str,
+    conversation: Optional[Conversation],
+    conversation_id: Optional[str],
     manager: ConnectionManager,
     db: AsyncSession,
 ):
-    last_ts = datetime.strptime(str(data.get("last_message_at")), "%Y-%m-%d %H:%M:%S")
+    """
+    Stream what the user missed in bounded `missed_messages` chunks, then a
+    `reconnect_success` saying whether there is more to fetch.
+    The conversation the event arrived on is not used: each resume names
+    its conversations or covers all of the user's, so gateway sockets can
+    reconnect before subscribing to anything.
+    Clients resume with `last_seq`, a map of conversation id to the last
+    sequence number they hold. Older clients may still send
+    `last_message_at` and then the returned `cursor`.
+    """
 
-    missed = await MessageService.list_messages_since(
-        db, user_id=user.id, timestamp=last_ts
-    )
+    if "last_seq" in data:
+        await _resume_by_seq(data, websocket, user, manager, db)
+    else:
+        await _resume_by_time(data, websocket, user, manager, db)
+
+
+async def _resume_by_seq(
+    data: dict,
+    websocket: WebSocket,
+    user: User,
+    manager: ConnectionManager,
+    db: AsyncSession,
+):
+    last_seqs = data.get("last_seq")
+
+    if not isinstance(last_seqs, dict):
+        raise AppException("last_seq must map conversation ids to sequence numbers")
+
+    pages_left = CATCH_UP_MAX_PAGES
+    conversations = {}
+    gaps = []
+
+    for resume_id, after_seq in last_seqs.items():
+        if isinstance(after_seq, bool) or not isinstance(after_seq, int):
+            raise AppException(f"Invalid sequence number: {after_seq}")
+
+        resume_key = str(await to_uuid(resume_id))
+        expected = after_seq + 1
+        last_seq = None
+
+        while pages_left:
+            # Active rooms are answered from the recent-message buffer
+            cached = manager.recent.after_seq(
+                resume_key, str(user.id), expected - 1, CATCH_UP_PAGE_SIZE
+            )
+
+            if cached is not None:
+                last_seq, missed = cached
+            else:
+                last_seq, rows = await MessageService.list_messages_after_seq(
+                    db,
+                    user_id=user.id,
+                    conversation_id=resume_key,
+                    after_seq=expected - 1,
+                    limit=CATCH_UP_PAGE_SIZE,
+                )
+                missed = [message_entry(m) for m in rows]
+
+            if not missed:
+                break
+
+            pages_left -= 1
+
+            for m in missed:
+                if m["seq"] != expected:
+                    # Numbers are never reused, so a hole means rows are gone
+                    gaps.append(
+                        {
+                            "conversation_id": resume_key,
+                            "from_seq": expected,
+                            "to_seq": m["seq"] - 1,
+                        }
+                    )
+
+                expected = m["seq"] + 1
 
-    await websocket.send_json(
+            await manager.send_to_socket(
+                websocket,
+                {
+                    "event": "missed_messages",
+                    "conversation_id": resume_key,
+                    "messages": [_missed_message(m) for m in missed],
+                },
+            )
+
+            if len(missed) < CATCH_UP_PAGE_SIZE:
+                break
+
+        if last_seq is None:
+            # Out of pages before this conversation was looked at
+            conversations[resume_key] = {"seq": after_seq, "has_more": True}
+            continue
+
+        conversations[resume_key] = {
+            "seq": expected - 1,
+            "last_seq": last_seq,
+            "has_more": expected - 1 < last_seq,
+            # The client claims messages this conversation never had
+            "resync": after_seq > last_seq,
+        }
+
+    await manager.send_to_socket(
+        websocket,
         {
             "event": "reconnect_success",
-            "missed_messages": [
+            "conversations": conversations,
+            "gaps": gaps,
+            "has_more": any(c["has_more"] for c in conversations.values()),
+        },
+    )
+
+
+async def _resume_by_time(
+    data: dict,
+    websocket: WebSocket,
+    user: User,
+    manager: ConnectionManager,
+    db: AsyncSession,
+):
+    cursor = data.get("cursor")
+    last_ts = parse_timestamp(data.get("last_message_at")) if not cursor else None
+
+    sent = 0
+
+    for _ in range(CATCH_UP_MAX_PAGES):
+        missed, cursor = await MessageService.list_messages_since(
+            db,
+            user_id=user.id,
+            timestamp=last_ts,
+            cursor=cursor,
+            limit=CATCH_UP_PAGE_SIZE,
+        )
+
+        if missed:
+            await manager.send_to_socket(
+                websocket,
                 {
-                    "id": str(m.id),
-                    "content": m.content,
-                    "sender_id": str(m.sender_id),
-                    "sent_at": m.sent_at.isoformat(),
-                }
-                for m in missed
-            ],
-        }
+                    "event": "missed_messages",
+                    "messages": [_missed_message(message_entry(m)) for m in missed],
+                },
+            )
+            sent += len(missed)
+
+        if not cursor:
+            break
+
+    await manager.send_to_socket(
+        websocket,
+        {
+            "event": "reconnect_success",
+            "count": sent,
+            "cursor": cursor,
+            "has_more": cursor is not None,
+        },
     )
 
 
@@ -56,14 +214,14 @@ async def handle_resume_conversation(
     await UnreadService.reset(db, conversation_id=new_conv_id, user_id=user.id)
 
     await manager.broadcast_to_conversation(
-        conversation_id=new_conv_id,
+        conversation_id=str(new_conv_id),
         message={
             "event": "unread_update",
-            "conversation_id": str(new_conv_id),
+            "conversation_id": new_conv_id,
             "unread": 0,
         },
     )
 
-    await websocket.send_json(
-        {"event": "resume_success", "conversation_id": str(new_conv_id)}
+    await manager.send_to_socket(
+        websocket, {"event": "resume_success", "conversation_id": new_conv_id}
     )
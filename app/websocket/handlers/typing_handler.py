@@ -14,7 +14,7 @@ async def handle_typing_start(
     manager: ConnectionManager,
     db: AsyncSession,
 ):
-    await manager.broadcast_typing(str(conversation_id), str(user.id), True)
+    manager.set_typing(str(conversation_id), str(user.id), True)
 
 
 async def handle_typing_stop(
@@ -26,4 +26,4 @@ async def handle_typing_stop(
     manager: ConnectionManager,
     db: AsyncSession,
 ):
-    await manager.broadcast_typing(str(conversation_id), str(user.id), False)
+    manager.set_typing(str(conversation_id), str(user.id), False)
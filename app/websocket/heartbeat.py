@@ -0,0 +1,115 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from app.utils.logging_util import get_logger
+from app.websocket.connection import (
+    Connection,
+    FrameCache,
+    HEARTBEAT_TIMEOUT_CLOSE_CODE,
+    PING_EVENT,
+)
+from app.websocket.manager import ConnectionManager
+from app.websocket.notification_manager import NotificationManager
+
+logger = get_logger(__name__)
+
+
+class Heartbeat:
+    """
+    Pings idle sockets and reaps the ones that stop answering.
+    A single timer task walks every connection of the given managers once per
+    interval, so the cost is one wake-up per worker rather than one sleeping
+    task per socket.
+    Only clients that opted in to the application-level ping are pinged and
+    reaped; the others are covered by the server's protocol-level ping/pong.
+    """
+
+    REAP_BATCH_SIZE = 200
+
+    def __init__(
+        self,
+        managers: List[ConnectionManager | NotificationManager],
+        interval: float = 25,
+        timeout: float = 60,
+    ):
+        self.managers = managers
+        self.interval = interval
+        self.timeout = timeout
+
+        self._task: Optional[asyncio.Task] = None
+        self._ping = FrameCache({"event": PING_EVENT})
+
+        self.ticks = 0
+        self.pings_sent = 0
+        self.reaped = 0
+        self.last_tick_ms = 0.0
+
+    async def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception("Heartbeat tick failed")
+
+    async def tick(self):
+        started = time.perf_counter()
+        now = time.monotonic()
+        stale: List[Connection] = []
+
+        for connection in self._connections():
+            if not connection.heartbeat:
+                continue
+
+            idle = now - connection.last_seen
+
+            if self.timeout and idle >= self.timeout:
+                stale.append(connection)
+            elif idle >= self.interval:
+                if connection.send_frame(self._ping.for_codec(connection.codec)):
+                    self.pings_sent += 1
+
+        for start in range(0, len(stale), self.REAP_BATCH_SIZE):
+            batch = stale[start : start + self.REAP_BATCH_SIZE]
+
+            await asyncio.gather(
+                *(c.close(code=HEARTBEAT_TIMEOUT_CLOSE_CODE) for c in batch)
+            )
+            self.reaped += len(batch)
+
+        if stale:
+            logger.info("Heartbeat reaped %s unresponsive sockets", len(stale))
+
+        self.ticks += 1
+        self.last_tick_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    def _connections(self) -> List[Connection]:
+        # Gateway sockets are registered with several managers; visit them once
+        unique: Dict[int, Connection] = {}
+
+        for manager in self.managers:
+            for connection in manager.connections.values():
+                unique.setdefault(id(connection), connection)
+
+        return list(unique.values())
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "timeout": self.timeout,
+            "ticks": self.ticks,
+            "pings_sent": self.pings_sent,
+            "reaped": self.reaped,
+            "last_tick_ms": self.last_tick_ms,
+        }
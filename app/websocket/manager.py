@@ -1,12 +1,45 @@
 import asyncio
-from typing import Dict, Set
-from fastapi import WebSocket, WebSocketDisconnect
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Set
+from fastapi import WebSocket
+from app.websocket.actors import ConversationActors
+from app.websocket.backplane import Backplane, InProcessBackplane
+from app.websocket.codecs import negotiate_codec
+from app.websocket.connection import (
+    Connection,
+    FrameCache,
+    OverflowPolicy,
+    requested_coalesce_window,
+    requested_heartbeat,
+)
+from app.websocket.recent_messages import RecentMessages
+from app.websocket.typing_tracker import TypingTracker
 
 
 class ConnectionManager:
     DISCONNECT_GRACE_SECONDS = 4
+    PRESENCE_QUERY_TIMEOUT_SECONDS = 0.25
+    SEND_TIMEOUT_SECONDS = 5
+    BACKPLANE_CHANNEL = "chat"
+
+    def __init__(
+        self,
+        max_queue: int = 256,
+        overflow_policy: OverflowPolicy = OverflowPolicy.drop_low_value,
+        backplane: Optional[Backplane] = None,
+        conversation_actors: bool = False,
+        recent_messages: Optional[RecentMessages] = None,
+    ):
+        self.max_queue = max_queue
+        self.overflow_policy = overflow_policy
+
+        # Broadcasts go through the backplane so every worker delivers them
+        # to its own sockets
+        self.backplane = backplane or InProcessBackplane()
+        self.backplane.subscribe(self.BACKPLANE_CHANNEL, self._on_backplane_message)
+
+        # websocket -> outbound connection wrapper
+        self.connections: Dict[WebSocket, Connection] = {}
 
-    def __init__(self):
         # user_id -> set of websocket connections
         self.active_users: Dict[str, Set[WebSocket]] = {}
 
@@ -16,10 +49,55 @@ class ConnectionManager:
         # user_id -> connection count
         self.presence: Dict[str, int] = {}
 
+        # Reverse indexes so removal and membership checks never scan
+        # websocket -> user_id
+        self.socket_users: Dict[WebSocket, str] = {}
+
+        # websocket -> conversation ids the socket has joined
+        self.socket_rooms: Dict[WebSocket, Set[str]] = {}
+
+        # user_id -> conversation_id -> number of the user's sockets in it
+        self.user_rooms: Dict[str, Dict[str, int]] = {}
+
+        # Presence subscriptions, kept only for users connected to this worker
+        # user_id -> conversation partners and accepted friends
+        self.contacts: Dict[str, Set[str]] = {}
+
+        # user_id -> connected users who want that user's presence
+        self.subscribers: Dict[str, Set[str]] = {}
+
+        # Throttled, self-expiring typing state per (conversation, user)
+        self.typing = TypingTracker(emit=self.broadcast_typing)
+
+        # user_id -> set once another worker reports a socket for that user
+        self._presence_queries: Dict[str, asyncio.Event] = {}
+
+        # Optional per-conversation serialization of DB-bound events
+        self.actors = ConversationActors() if conversation_actors else None
+
+        # Newest messages of active conversations, kept in step on every worker
+        self.recent = recent_messages or RecentMessages()
+
     async def connect(self, websocket: WebSocket, user_id: str):
-        await websocket.accept()
+        codec = negotiate_codec(websocket)
+        await websocket.accept(subprotocol=codec.subprotocol)
+
+        connection = Connection(
+            websocket,
+            user_id=user_id,
+            max_queue=self.max_queue,
+            overflow_policy=self.overflow_policy,
+            send_timeout=self.SEND_TIMEOUT_SECONDS,
+            codec=codec,
+            coalesce_window=requested_coalesce_window(websocket),
+            heartbeat=requested_heartbeat(websocket),
+            on_close=self._on_connection_closed,
+        )
+        self.connections[websocket] = connection
+        connection.start()
 
         self.active_users.setdefault(user_id, set()).add(websocket)
+        self.socket_users[websocket] = user_id
 
         previous_count = self.presence.get(user_id, 0)
         new_count = previous_count + 1
@@ -31,16 +109,18 @@ class ConnectionManager:
         return None
 
     def disconnect(self, websocket: WebSocket, user_id: str):
-        if user_id in self.active_users:
-            self.active_users[user_id].discard(websocket)
+        connection = self.connections.pop(websocket, None)
 
-            if not self.active_users[user_id]:
-                del self.active_users[user_id]
+        if connection:
+            connection.stop()
+
+        self._remove_dead_socket(websocket)
 
         count = self.presence.get(user_id, 0) - 1
 
         if count <= 0:
             self.presence.pop(user_id, None)
+            self.drop_contacts(user_id)
             return "offline"
 
         self.presence[user_id] = count
@@ -49,57 +129,273 @@ class ConnectionManager:
     async def delayed_presence_check(self, user_id: str):
         await asyncio.sleep(self.DISCONNECT_GRACE_SECONDS)
 
-        if user_id not in self.active_users:
-            return "offline"
+        if user_id in self.active_users:
+            return None
 
-        return None
+        if await self._connected_elsewhere(user_id):
+            return None
+
+        return "offline"
+
+    async def _connected_elsewhere(self, user_id: str) -> bool:
+        """Ask the other workers whether they still hold a socket for the user."""
+
+        if not self.backplane.distributed:
+            return False
+
+        claimed = self._presence_queries.get(user_id)
+
+        if claimed is None:
+            claimed = self._presence_queries[user_id] = asyncio.Event()
+
+        try:
+            await self.backplane.publish(
+                self.BACKPLANE_CHANNEL,
+                {"type": "presence_query", "target": user_id, "message": {}},
+            )
+            await asyncio.wait_for(
+                claimed.wait(), timeout=self.PRESENCE_QUERY_TIMEOUT_SECONDS
+            )
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            if self._presence_queries.get(user_id) is claimed:
+                del self._presence_queries[user_id]
 
     def join_conversation(self, websocket: WebSocket, conversation_id: str):
+        rooms = self.socket_rooms.setdefault(websocket, set())
+
+        if conversation_id in rooms:
+            return
+
+        rooms.add(conversation_id)
         self.conversations.setdefault(conversation_id, set()).add(websocket)
 
+        user_id = self.socket_users.get(websocket)
+
+        if user_id is not None:
+            user_rooms = self.user_rooms.setdefault(user_id, {})
+            user_rooms[conversation_id] = user_rooms.get(conversation_id, 0) + 1
+
     def leave_conversation(self, websocket: WebSocket, conversation_id: str):
-        if conversation_id in self.conversations:
-            self.conversations[conversation_id].discard(websocket)
+        rooms = self.socket_rooms.get(websocket)
+
+        if not rooms or conversation_id not in rooms:
+            return
 
-            if not self.conversations[conversation_id]:
+        rooms.discard(conversation_id)
+
+        if not rooms:
+            del self.socket_rooms[websocket]
+
+        room = self.conversations.get(conversation_id)
+
+        if room is not None:
+            room.discard(websocket)
+
+            if not room:
                 del self.conversations[conversation_id]
 
-    async def _safe_broadcast(self, sockets: Set, message: dict):
+        user_id = self.socket_users.get(websocket)
+        user_rooms = self.user_rooms.get(user_id, {}) if user_id else {}
+
+        if conversation_id in user_rooms:
+            user_rooms[conversation_id] -= 1
+
+            if user_rooms[conversation_id] <= 0:
+                del user_rooms[conversation_id]
+
+                # The user's last socket left the room mid-typing
+                self.typing.stop(conversation_id, user_id)  # type: ignore
+
+            if not user_rooms:
+                del self.user_rooms[user_id]  # type: ignore
+
+    def is_in_conversation(self, websocket: WebSocket, conversation_id: str) -> bool:
+        return conversation_id in self.socket_rooms.get(websocket, ())
+
+    def is_user_in_conversation(self, user_id: str, conversation_id: str) -> bool:
+        return conversation_id in self.user_rooms.get(user_id, {})
+
+    def set_contacts(self, user_id: str, contact_ids: Iterable[str]):
+        self.drop_contacts(user_id)
+
+        for contact_id in contact_ids:
+            self._subscribe(user_id, contact_id)
+
+    def add_contact(self, user_a: str, user_b: str):
+        if user_a in self.presence:
+            self._subscribe(user_a, user_b)
+
+        if user_b in self.presence:
+            self._subscribe(user_b, user_a)
+
+    def drop_contacts(self, user_id: str):
+        for contact_id in self.contacts.pop(user_id, set()):
+            watchers = self.subscribers.get(contact_id)
+
+            if watchers is not None:
+                watchers.discard(user_id)
+
+                if not watchers:
+                    del self.subscribers[contact_id]
+
+    def _subscribe(self, user_id: str, contact_id: str):
+        if user_id == contact_id:
+            return
+
+        self.contacts.setdefault(user_id, set()).add(contact_id)
+        self.subscribers.setdefault(contact_id, set()).add(user_id)
+
+    async def _safe_broadcast(self, sockets: Iterable[WebSocket], message: dict):
+        # Encode lazily, and only once per codec for the whole batch
+        frames = FrameCache(message)
+
         for ws in list(sockets):
-            try:
-                await ws.send_json(message)
-            except (WebSocketDisconnect, Exception):
-                self._remove_dead_socket(ws)
+            connection = self.connections.get(ws)
+
+            if connection:
+                connection.send_frame(frames.for_codec(connection.codec))
+
+    def _on_connection_closed(self, connection: Connection):
+        if self.connections.get(connection.websocket) is connection:
+            del self.connections[connection.websocket]
+            self._remove_dead_socket(connection.websocket)
+
+    def stats(self) -> dict:
+        connections = [connection.stats() for connection in self.connections.values()]
+        stats = {
+            "connections": len(connections),
+            "queued": sum(c["queue_depth"] for c in connections),
+            "dropped": sum(c["dropped"] for c in connections),
+            "overflows": sum(c["overflows"] for c in connections),
+            # Served on the public health route, so counts only: no user ids
+            "slow_consumers": sum(1 for c in connections if c["overflows"]),
+        }
+
+        if self.actors is not None:
+            stats["actors"] = self.actors.stats()
+
+        stats["recent_messages"] = self.recent.stats()
+
+        return stats
+
+    async def run_in_conversation(
+        self, conversation_id: str, job: Callable[[], Awaitable[None]]
+    ):
+        """
+        Run an event handler in the conversation's order. With actors enabled,
+        handlers for one room never interleave, whichever socket sent them.
+        """
+
+        if self.actors is None:
+            return await job()
+
+        return await self.actors.run(conversation_id, job)
+
+    async def send_to_socket(self, websocket: WebSocket, message: dict):
+        connection = self.connections.get(websocket)
+
+        if connection:
+            connection.send(message)
 
     async def broadcast_to_conversation(self, conversation_id: str, message: dict):
-        sockets = self.conversations.get(conversation_id, set())
-        await self._safe_broadcast(sockets, message)
+        await self.backplane.publish(
+            self.BACKPLANE_CHANNEL,
+            {"type": "room", "target": conversation_id, "message": message},
+        )
+
+    def set_typing(self, conversation_id: str, user_id: str, is_typing: bool):
+        if is_typing:
+            self.typing.start(conversation_id, user_id)
+        else:
+            self.typing.stop(conversation_id, user_id)
 
     async def broadcast_typing(
         self, conversation_id: str, user_id: str, is_typing: bool
     ):
-        message = {"event": "typing", "user_id": user_id, "is_typing": is_typing}
-        sockets = self.conversations.get(conversation_id, set())
-        await self._safe_broadcast(sockets, message)
+        message = {
+            "event": "typing",
+            "conversation_id": conversation_id,
+            "user_id": user_id,
+            "is_typing": is_typing,
+        }
+        await self.broadcast_to_conversation(conversation_id, message)
+
+    async def broadcast_contact(self, user_a: str, user_b: str):
+        """Subscribe two users to each other's presence on every worker."""
+
+        await self.backplane.publish(
+            self.BACKPLANE_CHANNEL,
+            {"type": "contact", "target": user_a, "message": {"contact": user_b}},
+        )
+
+    async def cache_message(self, conversation_id: str, entry: dict, new: bool):
+        """Record a committed message in the recent buffers of every worker."""
+
+        await self.backplane.publish(
+            self.BACKPLANE_CHANNEL,
+            {
+                "type": "recent",
+                "target": conversation_id,
+                "message": {"entry": entry, "new": new},
+            },
+        )
 
     async def broadcast_presence(self, user_id: str, status: str):
         message = {"event": "presence", "user_id": user_id, "status": status}
 
-        for uid, sockets in self.active_users.items():
-            if uid != user_id:
-                await self._safe_broadcast(sockets, message)
-
-    def _remove_dead_socket(self, websocket):
-        # Remove from active users
-        for user_id, sockets in list(self.active_users.items()):
-            if websocket in sockets:
-                sockets.remove(websocket)
-                if not sockets:
-                    del self.active_users[user_id]
-
-        # Remove from conversation room
-        for conv_id, sockets in list(self.conversations.items()):
-            if websocket in sockets:
-                sockets.remove(websocket)
-                if not sockets:
-                    del self.conversations[conv_id]
+        await self.backplane.publish(
+            self.BACKPLANE_CHANNEL,
+            {"type": "presence", "target": user_id, "message": message},
+        )
+
+    async def _on_backplane_message(self, envelope: dict):
+        target = envelope["target"]
+
+        if envelope["type"] == "contact":
+            self.add_contact(target, envelope["message"]["contact"])
+            return
+
+        if envelope["type"] == "recent":
+            self.recent.record(target, **envelope["message"])
+            return
+
+        if envelope["type"] == "presence_query":
+            if target in self.active_users:
+                await self.backplane.publish(
+                    self.BACKPLANE_CHANNEL,
+                    {"type": "presence_claim", "target": target, "message": {}},
+                )
+            return
+
+        if envelope["type"] == "presence_claim":
+            claimed = self._presence_queries.get(target)
+
+            if claimed is not None:
+                claimed.set()
+            return
+
+        if envelope["type"] == "presence":
+            sockets: Iterable[WebSocket] = [
+                ws
+                for uid in self.subscribers.get(target, ())
+                for ws in self.active_users.get(uid, ())
+            ]
+        else:
+            sockets = self.conversations.get(target, set())
+
+        await self._safe_broadcast(sockets, envelope["message"])
+
+    def _remove_dead_socket(self, websocket: WebSocket):
+        for conversation_id in list(self.socket_rooms.get(websocket, ())):
+            self.leave_conversation(websocket, conversation_id)
+
+        user_id = self.socket_users.pop(websocket, None)
+
+        if user_id is not None and user_id in self.active_users:
+            self.active_users[user_id].discard(websocket)
+
+            if not self.active_users[user_id]:
+                del self.active_users[user_id]
@@ -1,30 +1,117 @@
-from typing import Dict, Set
-from fastapi import WebSocketDisconnect, WebSocket
+from typing import Dict, Optional, Set
+from fastapi import WebSocket
+from app.websocket.backplane import Backplane, InProcessBackplane
+from app.websocket.codecs import negotiate_codec
+from app.websocket.connection import (
+    Connection,
+    FrameCache,
+    OverflowPolicy,
+    requested_coalesce_window,
+    requested_heartbeat,
+)
 
 
 class NotificationManager:
-    def __init__(self):
+    SEND_TIMEOUT_SECONDS = 5
+    BACKPLANE_CHANNEL = "notifications"
+
+    def __init__(
+        self,
+        max_queue: int = 256,
+        overflow_policy: OverflowPolicy = OverflowPolicy.drop_low_value,
+        backplane: Optional[Backplane] = None,
+    ):
+        self.max_queue = max_queue
+        self.overflow_policy = overflow_policy
+
+        self.backplane = backplane or InProcessBackplane()
+        self.backplane.subscribe(self.BACKPLANE_CHANNEL, self._on_backplane_message)
+
+        self.connections: Dict[WebSocket, Connection] = {}
         self.user_sockets: Dict[str, Set] = {}
 
     async def connect(self, websocket: WebSocket, user_id: str):
-        await websocket.accept()
+        codec = negotiate_codec(websocket)
+        await websocket.accept(subprotocol=codec.subprotocol)
+
+        connection = Connection(
+            websocket,
+            user_id=user_id,
+            max_queue=self.max_queue,
+            overflow_policy=self.overflow_policy,
+            send_timeout=self.SEND_TIMEOUT_SECONDS,
+            codec=codec,
+            coalesce_window=requested_coalesce_window(websocket),
+            heartbeat=requested_heartbeat(websocket),
+        )
+        connection.start()
 
-        self.user_sockets.setdefault(user_id, set()).add(websocket)
+        self.attach(connection)
+
+    def attach(self, connection: Connection):
+        """Deliver notifications on a connection owned by another endpoint."""
+
+        if connection.websocket in self.connections:
+            return
+
+        self.connections[connection.websocket] = connection
+        self.user_sockets.setdefault(connection.user_id, set()).add(
+            connection.websocket
+        )
+        connection.add_close_callback(self._on_connection_closed)
 
     def disconnect(self, websocket: WebSocket, user_id: str):
+        connection = self.connections.pop(websocket, None)
+
+        if connection:
+            connection.stop()
+
         if user_id in self.user_sockets:
             self.user_sockets[user_id].discard(websocket)
 
             if not self.user_sockets[user_id]:
                 del self.user_sockets[user_id]
 
+    def _on_connection_closed(self, connection: Connection):
+        if self.connections.get(connection.websocket) is connection:
+            self.disconnect(connection.websocket, user_id=connection.user_id)
+
     async def send_notifications(self, user_id: str, payload: Dict):
-        sockets = self.user_sockets.get(user_id, set())
+        await self.backplane.publish(
+            self.BACKPLANE_CHANNEL, {"target": user_id, "message": payload}
+        )
+
+    async def send_inbox_delta(self, user_id: str, conversation_id: str, **changes):
+        """
+        Push the inbox fields of one conversation that just changed for
+        `user_id`: last_message, last_activity_at, unread_count, is_muted or
+        is_pinned. Clients merge them into their list instead of polling it.
+        """
+
+        await self.send_notifications(
+            user_id,
+            {"event": "inbox_delta", "conversation_id": conversation_id, **changes},
+        )
+
+    async def _on_backplane_message(self, envelope: dict):
+        payload = envelope["message"]
+        sockets = self.user_sockets.get(envelope["target"], set())
+        frames = FrameCache(payload)
 
         for ws in list(sockets):
-            try:
-                await ws.send_json(payload)
-            except WebSocketDisconnect:
-                self.disconnect(ws, user_id=user_id)
-            except Exception:
-                self.disconnect(ws, user_id=user_id)
+            connection = self.connections.get(ws)
+
+            if connection:
+                connection.send_frame(frames.for_codec(connection.codec))
+
+    def stats(self) -> dict:
+        connections = [connection.stats() for connection in self.connections.values()]
+
+        return {
+            "connections": len(connections),
+            "queued": sum(c["queue_depth"] for c in connections),
+            "dropped": sum(c["dropped"] for c in connections),
+            "overflows": sum(c["overflows"] for c in connections),
+            # Served on the public health route, so counts only: no user ids
+            "slow_consumers": sum(1 for c in connections if c["overflows"]),
+        }
@@ -0,0 +1,73 @@
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Hashable, Optional, Set
+
+from app.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+Job = Callable[[], Awaitable[None]]
+
+
+class EventPipeline:
+    """
+    Runs a socket's inbound events without waiting for one to finish before
+    reading the next.
+    Jobs submitted with the same lane key run one after another in arrival
+    order; different lanes run concurrently. Jobs without a lane run inline
+    in the read loop, which keeps DB-free work such as typing off the queue.
+    `max_in_flight` bounds the queued and running events, so a client that
+    outpaces its handlers is slowed down at the read loop.
+    """
+
+    def __init__(self, max_in_flight: int = 16):
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._lanes: Dict[Hashable, Deque[Job]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def in_flight(self) -> int:
+        return sum(len(queue) for queue in self._lanes.values())
+
+    async def submit(self, lane: Optional[Hashable], job: Job):
+        if lane is None:
+            await self._execute(job)
+            return
+
+        await self._slots.acquire()
+
+        queue = self._lanes.get(lane)
+
+        if queue is not None:
+            queue.append(job)
+            return
+
+        self._lanes[lane] = deque([job])
+
+        task = asyncio.create_task(self._drain_lane(lane))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _drain_lane(self, lane: Hashable):
+        queue = self._lanes[lane]
+
+        try:
+            while queue:
+                try:
+                    await self._execute(queue[0])
+                finally:
+                    queue.popleft()
+                    self._slots.release()
+        finally:
+            del self._lanes[lane]
+
+    async def _execute(self, job: Job):
+        try:
+            await job()
+        except Exception:
+            logger.exception("WebSocket event failed")
+
+    async def close(self):
+        """Wait for everything already accepted to finish."""
+
+        await asyncio.gather(*list(self._tasks), return_exceptions=True)
@@ -0,0 +1,37 @@
+from datetime import datetime, UTC
+from typing import Callable
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user_model import User
+from app.services.conversation_service import ConversationService
+from app.services.friend_service import FriendService
+from app.services.user_service import UserService
+from app.websocket.state import connection_manager
+
+
+async def announce_online(sessions: Callable[[], AsyncSession], user: User):
+    user_id = str(user.id)
+
+    async with sessions() as db:
+        partner_ids = await ConversationService.list_partner_ids(db, user_id=user.id)
+        friend_ids = await FriendService.list_friend_ids(db, user_id=user.id)
+
+    connection_manager.set_contacts(user_id, partner_ids | friend_ids)
+
+    await connection_manager.broadcast_presence(user_id, "online")
+
+
+async def announce_offline(sessions: Callable[[], AsyncSession], user: User):
+    user_id = str(user.id)
+
+    # No session is held through the grace period
+    result = await connection_manager.delayed_presence_check(user_id)
+
+    if result == "offline":
+        last_seen = datetime.now(UTC)
+
+        async with sessions() as db:
+            await UserService.update_last_seen(db, user_id=user.id, last_seen=last_seen)
+
+        user.last_seen = last_seen
+
+        await connection_manager.broadcast_presence(user_id, "offline")
@@ -0,0 +1,183 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+
+# Rough per-entry cost on top of the message text: the dict, ids and datetimes
+ENTRY_OVERHEAD_BYTES = 512
+
+
+def message_entry(message) -> dict:
+    """The cached, wire-ready form of a Message row."""
+
+    return {
+        "id": message.id,
+        "conversation_id": message.conversation_id,
+        "seq": message.seq,
+        "sender_id": message.sender_id,
+        "receiver_id": message.receiver_id,
+        "content": message.content,
+        "status": message.status,
+        "is_deleted": message.is_deleted,
+        "sent_at": message.sent_at,
+        "delivered_at": message.delivered_at,
+        "read_at": message.read_at,
+        "edited_at": message.edited_at,
+    }
+
+
+def _entry_size(entry: dict) -> int:
+    return ENTRY_OVERHEAD_BYTES + len(entry.get("content") or "")
+
+
+class _Buffer:
+    __slots__ = ("entries", "members", "size")
+
+    def __init__(self):
+        # seq -> entry, for the newest messages seen since the buffer opened
+        self.entries: Dict[int, dict] = {}
+        self.members: Set[str] = set()
+        self.size = 0
+
+
+class RecentMessages:
+    """
+    Ring buffer of the newest messages of each active conversation.
+    A buffer opens on the first message sent to a conversation and keeps the
+    last `per_conversation` of them by sequence number; edits, deletes and
+    receipts replace entries in place. Buffers are evicted least recently
+    used first once the estimated size passes `max_bytes`.
+    A read is only served when the buffer holds every message of the range
+    it asks for, so a miss always falls back to the database.
+    """
+
+    def __init__(self, per_conversation: int = 50, max_bytes: int = 32 * 1024**2):
+        self.per_conversation = per_conversation
+        self.max_bytes = max_bytes
+
+        self._buffers: "OrderedDict[str, _Buffer]" = OrderedDict()
+        self.size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def record(self, conversation_id: str, entry: dict, new: bool = False):
+        """
+        Store a committed message. New messages open or extend the buffer;
+        updates only touch an entry that is already cached.
+        """
+
+        if self.per_conversation <= 0:
+            return
+
+        buffer = self._buffers.get(conversation_id)
+        seq = entry["seq"]
+
+        if buffer is None:
+            if not new:
+                return
+
+            buffer = self._buffers[conversation_id] = _Buffer()
+        elif not new and seq not in buffer.entries:
+            return
+
+        previous = buffer.entries.get(seq)
+
+        if previous is not None:
+            self._resize(buffer, -_entry_size(previous))
+
+        buffer.entries[seq] = entry
+        buffer.members.update((str(entry["sender_id"]), str(entry["receiver_id"])))
+        self._resize(buffer, _entry_size(entry))
+
+        while len(buffer.entries) > self.per_conversation:
+            oldest = min(buffer.entries)
+            self._resize(buffer, -_entry_size(buffer.entries.pop(oldest)))
+
+        self._buffers.move_to_end(conversation_id)
+        self._evict()
+
+    def after_seq(
+        self, conversation_id: str, user_id: str, after_seq: int, limit: int
+    ) -> Optional[tuple]:
+        """
+        `(last_seq, entries)` for the messages numbered above `after_seq`,
+        or None when the buffer cannot answer for this user.
+        """
+
+        buffer = self._buffers.get(conversation_id)
+
+        if buffer is None or not buffer.entries or user_id not in buffer.members:
+            self.misses += 1
+            return None
+
+        first, last = min(buffer.entries), max(buffer.entries)
+        wanted = range(after_seq + 1, min(last, after_seq + limit) + 1)
+
+        # Anything older than the buffer, or a hole left by a send whose
+        # record has not arrived yet, has to come from the database
+        if (
+            after_seq < first - 1
+            or after_seq > last
+            or not all(seq in buffer.entries for seq in wanted)
+        ):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._buffers.move_to_end(conversation_id)
+
+        return last, [buffer.entries[seq] for seq in wanted]
+
+    def before_seq(
+        self,
+        conversation_id: str,
+        user_id: str,
+        before_seq: Optional[int],
+        limit: int,
+    ) -> Optional[list]:
+        """
+        Newest-first page of the messages numbered below `before_seq` (the
+        latest ones when None), or None when the buffer cannot answer.
+        """
+
+        buffer = self._buffers.get(conversation_id)
+
+        if buffer is None or not buffer.entries or user_id not in buffer.members:
+            self.misses += 1
+            return None
+
+        last = max(buffer.entries)
+        top = last if before_seq is None else before_seq - 1
+        wanted = range(top, max(top - limit, 0), -1)
+
+        if top > last or not all(seq in buffer.entries for seq in wanted):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._buffers.move_to_end(conversation_id)
+
+        return [buffer.entries[seq] for seq in wanted]
+
+    def _resize(self, buffer: _Buffer, delta: int):
+        buffer.size += delta
+        self.size += delta
+
+    def _evict(self):
+        while self.size > self.max_bytes and self._buffers:
+            _, buffer = self._buffers.popitem(last=False)
+            self.size -= buffer.size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+
+        return {
+            "conversations": len(self._buffers),
+            "messages": sum(len(b.entries) for b in self._buffers.values()),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+        }
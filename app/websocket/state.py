@@ -1,5 +1,30 @@
+from app.core.config import settings
+from app.websocket.backplane import create_backplane
+from app.websocket.connection import OverflowPolicy
+from app.websocket.heartbeat import Heartbeat
 from app.websocket.manager import ConnectionManager
 from app.websocket.notification_manager import NotificationManager
+from app.websocket.recent_messages import RecentMessages
 
-connection_manager = ConnectionManager()
-notification_manager = NotificationManager()
+backplane = create_backplane(settings.backplane, path=settings.backplane_path)
+
+connection_manager = ConnectionManager(
+    max_queue=settings.ws_outbound_queue_size,
+    overflow_policy=OverflowPolicy(settings.ws_overflow_policy),
+    backplane=backplane,
+    conversation_actors=settings.ws_conversation_actors,
+    recent_messages=RecentMessages(
+        per_conversation=settings.ws_recent_messages_per_conversation,
+        max_bytes=settings.ws_recent_messages_max_bytes,
+    ),
+)
+notification_manager = NotificationManager(
+    max_queue=settings.ws_outbound_queue_size,
+    overflow_policy=OverflowPolicy(settings.ws_overflow_policy),
+    backplane=backplane,
+)
+heartbeat = Heartbeat(
+    managers=[connection_manager, notification_manager],
+    interval=settings.ws_ping_interval_seconds,
+    timeout=settings.ws_ping_timeout_seconds,
+)
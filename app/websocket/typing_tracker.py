@@ -0,0 +1,118 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+
+TypingKey = Tuple[str, str]
+TypingEmitter = Callable[[str, str, bool], Awaitable[None]]
+
+
+class _TypingState:
+    __slots__ = ("is_typing", "emitted", "last_emit_at", "expiry", "flush")
+
+    def __init__(self):
+        self.is_typing = False
+        self.emitted = False
+        self.last_emit_at = float("-inf")
+        self.expiry: Optional[asyncio.TimerHandle] = None
+        self.flush: Optional[asyncio.TimerHandle] = None
+
+
+class TypingTracker:
+    """
+    Server-side typing state per (conversation, user).
+    Repeated typing_start events only extend the TTL, at most one transition
+    is emitted per MIN_INTERVAL_SECONDS, and typing expires on its own after
+    TTL_SECONDS without a new typing_start.
+    """
+
+    TTL_SECONDS = 6
+    MIN_INTERVAL_SECONDS = 1
+
+    def __init__(self, emit: TypingEmitter):
+        self._emit = emit
+        self._states: Dict[TypingKey, _TypingState] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def is_typing(self, conversation_id: str, user_id: str) -> bool:
+        state = self._states.get((conversation_id, user_id))
+        return bool(state and state.emitted)
+
+    def start(self, conversation_id: str, user_id: str):
+        key = (conversation_id, user_id)
+        state = self._states.setdefault(key, _TypingState())
+
+        loop = asyncio.get_running_loop()
+        self._cancel(state.expiry)
+        state.expiry = loop.call_later(self.TTL_SECONDS, self.stop, *key)
+
+        self._transition(key, state, True)
+
+    def stop(self, conversation_id: str, user_id: str):
+        key = (conversation_id, user_id)
+        state = self._states.get(key)
+
+        if state is None:
+            return
+
+        self._cancel(state.expiry)
+        state.expiry = None
+
+        self._transition(key, state, False)
+
+    def _transition(self, key: TypingKey, state: _TypingState, is_typing: bool):
+        state.is_typing = is_typing
+
+        if state.emitted == is_typing:
+            self._cancel(state.flush)
+            state.flush = None
+
+            if not is_typing:
+                self._schedule_forget(key, state)
+
+            return
+
+        wait = state.last_emit_at + self.MIN_INTERVAL_SECONDS - time.monotonic()
+
+        if wait <= 0:
+            self._flush(key)
+        elif state.flush is None:
+            loop = asyncio.get_running_loop()
+            state.flush = loop.call_later(wait, self._flush, key)
+
+    def _flush(self, key: TypingKey):
+        state = self._states.get(key)
+
+        if state is None:
+            return
+
+        state.flush = None
+
+        if state.emitted != state.is_typing:
+            state.emitted = state.is_typing
+            state.last_emit_at = time.monotonic()
+            self._spawn(self._emit(key[0], key[1], state.emitted))
+
+        if not state.is_typing:
+            self._schedule_forget(key, state)
+
+    def _schedule_forget(self, key: TypingKey, state: _TypingState):
+        # Keep the state around just long enough to throttle the next start
+        loop = asyncio.get_running_loop()
+        self._cancel(state.expiry)
+        state.expiry = loop.call_later(self.MIN_INTERVAL_SECONDS, self._forget, key)
+
+    def _forget(self, key: TypingKey):
+        state = self._states.get(key)
+
+        if state and not state.is_typing and not state.emitted and not state.flush:
+            del self._states[key]
+
+    def _spawn(self, coro: Awaitable[None]):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    def _cancel(handle: Optional[asyncio.TimerHandle]):
+        if handle is not None:
+            handle.cancel()
@@ -0,0 +1,16 @@
+from uvicorn.workers import UvicornWorker as BaseUvicornWorker
+
+from app.core.config import settings
+
+
+class UvicornWorker(BaseUvicornWorker):
+    """
+    Gunicorn worker with protocol-level WebSocket ping/pong, which detects
+    half-open sockets for clients that do not speak the app-level heartbeat.
+    """
+
+    CONFIG_KWARGS = {
+        **BaseUvicornWorker.CONFIG_KWARGS,
+        "ws_ping_interval": settings.ws_ping_interval_seconds,
+        "ws_ping_timeout": settings.ws_ping_timeout_seconds,
+    }
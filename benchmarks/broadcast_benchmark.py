@@ -0,0 +1,159 @@
+"""
+Broadcast latency benchmark for ConnectionManager.
+
+Run with:
+    python -m benchmarks.broadcast_benchmark
+
+Every fake socket acknowledges a send after a simulated network delay; a small
+share of them behave like slow mobile clients. A sample is the time from the
+broadcast call until every socket has received the frame; "recipient ms" is
+the median time at which an individual socket received it, which shows
+whether ordinary recipients wait behind the slow ones. The "sequential"
+column replays the old one-socket-at-a-time loop for comparison.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from app.websocket.manager import ConnectionManager
+
+ROOM_SIZES = (2, 100, 10_000)
+FAST_DELAY_SECONDS = 0.0
+SLOW_DELAY_SECONDS = 0.005
+SLOW_RATIO = 0.01
+
+
+class DeliveryTracker:
+    def __init__(self):
+        self.expected = 0
+        self.received = 0
+        self.done = asyncio.Event()
+        self.acked_at: list[float] = []
+
+    def reset(self, expected: int):
+        self.expected = expected
+        self.received = 0
+        self.done.clear()
+        self.acked_at = []
+
+    def ack(self):
+        self.received += 1
+        self.acked_at.append(time.perf_counter())
+
+        if self.received >= self.expected:
+            self.done.set()
+
+
+class FakeWebSocket:
+    scope: dict = {}
+    query_params: dict = {}
+
+    def __init__(self, delay: float, tracker: DeliveryTracker):
+        self.delay = delay
+        self.tracker = tracker
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, data: str):
+        await asyncio.sleep(self.delay)
+        self.tracker.ack()
+
+
+async def build_room(
+    manager: ConnectionManager,
+    conversation_id: str,
+    size: int,
+    tracker: DeliveryTracker,
+):
+    rng = random.Random(size)
+
+    for i in range(size):
+        slow = rng.random() < SLOW_RATIO
+        delay = SLOW_DELAY_SECONDS if slow else FAST_DELAY_SECONDS
+        ws = FakeWebSocket(delay, tracker)
+        await manager.connect(ws, f"user-{i}")  # type: ignore
+        manager.join_conversation(ws, conversation_id)  # type: ignore
+
+
+async def sequential_broadcast(manager: ConnectionManager, conversation_id: str):
+    message = {"event": "new_message", "data": {"content": "hello"}}
+
+    for ws in list(manager.conversations.get(conversation_id, set())):
+        await ws.send_text(json.dumps(message))
+
+
+async def queued_broadcast(manager: ConnectionManager, conversation_id: str):
+    message = {"event": "new_message", "data": {"content": "hello"}}
+    await manager.broadcast_to_conversation(conversation_id, message)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def measure(
+    broadcast,
+    manager: ConnectionManager,
+    conversation_id: str,
+    tracker: DeliveryTracker,
+    iterations: int,
+):
+    samples = []
+    recipient_samples = []
+    size = len(manager.conversations[conversation_id])
+
+    for _ in range(iterations):
+        tracker.reset(size)
+        start = time.perf_counter()
+        await broadcast(manager, conversation_id)
+        await tracker.done.wait()
+        samples.append((time.perf_counter() - start) * 1000)
+        recipient_samples.append(
+            statistics.median(acked - start for acked in tracker.acked_at) * 1000
+        )
+
+    return samples, recipient_samples
+
+
+async def main(iterations: int):
+    print(
+        f"{'sockets':>8} | {'mode':>10} | {'p50 ms':>9} | {'p99 ms':>9} | "
+        f"{'mean ms':>9} | {'recipient ms':>12}"
+    )
+
+    for size in ROOM_SIZES:
+        manager = ConnectionManager(max_queue=iterations + 1)
+        tracker = DeliveryTracker()
+        conversation_id = f"room-{size}"
+        await build_room(manager, conversation_id, size, tracker)
+
+        for mode, broadcast in (
+            ("sequential", sequential_broadcast),
+            ("queued", queued_broadcast),
+        ):
+            samples, recipient_samples = await measure(
+                broadcast, manager, conversation_id, tracker, iterations
+            )
+            print(
+                f"{size:>8} | {mode:>10} | {percentile(samples, 50):>9.2f} | "
+                f"{percentile(samples, 99):>9.2f} | {statistics.mean(samples):>9.2f} | "
+                f"{statistics.median(recipient_samples):>12.2f}"
+            )
+
+        for ws in list(manager.connections):
+            manager.disconnect(ws, manager.connections[ws].user_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.iterations))
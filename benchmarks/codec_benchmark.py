@@ -0,0 +1,85 @@
+"""
+Wire-format benchmark for the WebSocket codecs.
+
+Run with:
+    python -m benchmarks.codec_benchmark
+
+Reports the encoded size of typical chat events and the encode/decode CPU
+time per event for JSON and the MessagePack subprotocol.
+"""
+
+import argparse
+import timeit
+import uuid
+from datetime import datetime, UTC
+
+from app.websocket.codecs import JSON_CODEC, MSGPACK_CODEC
+
+
+def sample_events() -> dict[str, dict]:
+    now = datetime.now(UTC)
+
+    return {
+        "new_message": {
+            "event": "new_message",
+            "data": {
+                "id": uuid.uuid4(),
+                "sender_id": uuid.uuid4(),
+                "receiver_id": uuid.uuid4(),
+                "content": "Are we still on for lunch tomorrow?",
+                "sent_at": now,
+            },
+        },
+        "message_read": {
+            "event": "message_read",
+            "data": {"message_id": uuid.uuid4(), "read_at": now},
+        },
+        "unread_update": {
+            "event": "unread_update",
+            "conversation_id": uuid.uuid4(),
+            "unread": 3,
+        },
+        "typing": {"event": "typing", "user_id": uuid.uuid4(), "is_typing": True},
+        "presence": {"event": "presence", "user_id": uuid.uuid4(), "status": "online"},
+    }
+
+
+def main(iterations: int):
+    codecs = [JSON_CODEC] + ([MSGPACK_CODEC] if MSGPACK_CODEC else [])
+
+    if MSGPACK_CODEC is None:
+        print("msgpack is not installed; only JSON is measured\n")
+
+    print(
+        f"{'event':>14} | {'codec':>8} | {'bytes':>6} | "
+        f"{'encode us':>10} | {'decode us':>10}"
+    )
+
+    for name, payload in sample_events().items():
+        for codec in codecs:
+            data = codec.encode(payload)
+            size = len(data.encode() if isinstance(data, str) else data)
+
+            encode_us = (
+                timeit.timeit(lambda: codec.encode(payload), number=iterations)
+                / iterations
+                * 1e6
+            )
+            decode_us = (
+                timeit.timeit(lambda: codec.decode(data), number=iterations)
+                / iterations
+                * 1e6
+            )
+
+            print(
+                f"{name:>14} | {codec.name:>8} | {size:>6} | "
+                f"{encode_us:>10.2f} | {decode_us:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    main(args.iterations)
@@ -0,0 +1,42 @@
+"""add delta sync indexes
+
+Revision ID: a2d6e8f4c1b7
+Revises: f1c4a7e3b9d2
+Create Date: 2026-10-18 15:02:41.530918
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a2d6e8f4c1b7"
+down_revision: Union[str, Sequence[str], None] = "f1c4a7e3b9d2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ("ix_conversations_user1_id_updated_at", "conversations", "user1_id"),
+    ("ix_conversations_user2_id_updated_at", "conversations", "user2_id"),
+    ("ix_conversation_unread_user_id_updated_at", "conversation_unread", "user_id"),
+    (
+        "ix_conversation_settings_user_id_updated_at",
+        "conversation_settings",
+        "user_id",
+    ),
+    ("ix_friendships_requester_id_updated_at", "friendships", "requester_id"),
+    ("ix_friendships_receiver_id_updated_at", "friendships", "receiver_id"),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, owner in INDEXES:
+        op.create_index(name, table, [owner, "updated_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,31 @@
+"""add messages conversation sent_at index
+
+Revision ID: b3f1c2d4e5a6
+Revises: 6ecf907ed1a5
+Create Date: 2026-10-18 10:12:41.503217
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b3f1c2d4e5a6"
+down_revision: Union[str, Sequence[str], None] = "6ecf907ed1a5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_messages_conversation_id_sent_at",
+        "messages",
+        ["conversation_id", "sent_at"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_messages_conversation_id_sent_at", table_name="messages")
@@ -0,0 +1,74 @@
+"""add message sequence numbers
+
+Revision ID: c7d2e9a1f4b3
+Revises: b3f1c2d4e5a6
+Create Date: 2026-10-18 11:04:17.882051
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c7d2e9a1f4b3"
+down_revision: Union[str, Sequence[str], None] = "b3f1c2d4e5a6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "conversations",
+        sa.Column("last_seq", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column("messages", sa.Column("seq", sa.Integer(), nullable=True))
+
+    # Number existing messages in (sent_at, id) order within each conversation
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("""
+            UPDATE messages SET seq = numbered.seq
+            FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY conversation_id ORDER BY sent_at, id
+                ) AS seq
+                FROM messages
+            ) AS numbered
+            WHERE messages.id = numbered.id
+            """)
+    else:
+        op.execute("""
+            UPDATE messages SET seq = (
+                SELECT COUNT(*) FROM messages AS earlier
+                WHERE earlier.conversation_id = messages.conversation_id
+                AND (
+                    earlier.sent_at < messages.sent_at
+                    OR (earlier.sent_at = messages.sent_at AND earlier.id <= messages.id)
+                )
+            )
+            """)
+
+    op.execute("""
+        UPDATE conversations SET last_seq = COALESCE(
+            (SELECT MAX(seq) FROM messages
+             WHERE messages.conversation_id = conversations.id),
+            0
+        )
+        """)
+
+    with op.batch_alter_table("messages") as batch_op:
+        batch_op.alter_column("seq", existing_type=sa.Integer(), nullable=False)
+        batch_op.create_unique_constraint(
+            "unique_message_seq", ["conversation_id", "seq"]
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("messages") as batch_op:
+        batch_op.drop_constraint("unique_message_seq", type_="unique")
+        batch_op.drop_column("seq")
+
+    op.drop_column("conversations", "last_seq")
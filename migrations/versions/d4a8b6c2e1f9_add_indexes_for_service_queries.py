@@ -0,0 +1,88 @@
+"""add indexes for service queries
+
+Revision ID: d4a8b6c2e1f9
+Revises: c7d2e9a1f4b3
+Create Date: 2026-10-18 12:21:06.114529
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "d4a8b6c2e1f9"
+down_revision: Union[str, Sequence[str], None] = "c7d2e9a1f4b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _drop_duplicate_rows(table: str) -> None:
+    # One row per (conversation_id, user_id) may have been inserted twice by
+    # concurrent requests; keep the one with the lowest id
+    op.execute(f"""
+        DELETE FROM {table}
+        WHERE EXISTS (
+            SELECT 1 FROM {table} AS kept
+            WHERE kept.conversation_id = {table}.conversation_id
+            AND kept.user_id = {table}.user_id
+            AND kept.id < {table}.id
+        )
+        """)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_messages_conversation_id_seq_undeleted",
+        "messages",
+        ["conversation_id", "seq"],
+        postgresql_where=sa.text("NOT is_deleted"),
+        sqlite_where=sa.text("NOT is_deleted"),
+    )
+
+    op.create_index("ix_conversations_user2_id", "conversations", ["user2_id"])
+
+    _drop_duplicate_rows("conversation_unread")
+    op.create_index(
+        "ix_conversation_unread_conversation_id_user_id",
+        "conversation_unread",
+        ["conversation_id", "user_id"],
+        unique=True,
+    )
+
+    _drop_duplicate_rows("conversation_settings")
+    op.create_index(
+        "ix_conversation_settings_conversation_id_user_id",
+        "conversation_settings",
+        ["conversation_id", "user_id"],
+        unique=True,
+    )
+
+    op.create_index(
+        "ix_friendships_requester_id_status",
+        "friendships",
+        ["requester_id", "status"],
+    )
+    op.create_index(
+        "ix_friendships_receiver_id_status",
+        "friendships",
+        ["receiver_id", "status"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_friendships_receiver_id_status", table_name="friendships")
+    op.drop_index("ix_friendships_requester_id_status", table_name="friendships")
+    op.drop_index(
+        "ix_conversation_settings_conversation_id_user_id",
+        table_name="conversation_settings",
+    )
+    op.drop_index(
+        "ix_conversation_unread_conversation_id_user_id",
+        table_name="conversation_unread",
+    )
+    op.drop_index("ix_conversations_user2_id", table_name="conversations")
+    op.drop_index("ix_messages_conversation_id_seq_undeleted", table_name="messages")
@@ -0,0 +1,63 @@
+"""add conversation last message pointer
+
+Revision ID: e5b9c3d7f2a8
+Revises: d4a8b6c2e1f9
+Create Date: 2026-10-18 13:02:44.630918
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.database.custom_types import GUID
+
+# revision identifiers, used by Alembic.
+revision: str = "e5b9c3d7f2a8"
+down_revision: Union[str, Sequence[str], None] = "d4a8b6c2e1f9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match PREVIEW_LENGTH in app.models.conversation_model
+PREVIEW_LENGTH = 200
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("conversations") as batch_op:
+        batch_op.add_column(sa.Column("last_message_id", GUID(), nullable=True))
+        batch_op.add_column(sa.Column("last_message_sender_id", GUID(), nullable=True))
+        batch_op.add_column(
+            sa.Column("last_message_at", sa.DateTime(timezone=True), nullable=True)
+        )
+        batch_op.add_column(
+            sa.Column("last_message_preview", sa.String(PREVIEW_LENGTH), nullable=True)
+        )
+
+    # Point every conversation at its newest visible message
+    latest = """
+        SELECT {column} FROM messages
+        WHERE messages.conversation_id = conversations.id AND NOT messages.is_deleted
+        ORDER BY messages.seq DESC
+        LIMIT 1
+    """
+
+    op.execute(f"""
+        UPDATE conversations SET
+            last_message_id = ({latest.format(column="id")}),
+            last_message_sender_id = ({latest.format(column="sender_id")}),
+            last_message_at = ({latest.format(column="sent_at")}),
+            last_message_preview = ({latest.format(
+                column=f"SUBSTR(content, 1, {PREVIEW_LENGTH})"
+            )})
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("conversations") as batch_op:
+        batch_op.drop_column("last_message_preview")
+        batch_op.drop_column("last_message_at")
+        batch_op.drop_column("last_message_sender_id")
+        batch_op.drop_column("last_message_id")
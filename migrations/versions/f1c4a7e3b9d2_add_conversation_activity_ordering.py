@@ -0,0 +1,71 @@
+"""add conversation activity ordering
+
+Revision ID: f1c4a7e3b9d2
+Revises: e5b9c3d7f2a8
+Create Date: 2026-10-18 13:47:19.205381
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "f1c4a7e3b9d2"
+down_revision: Union[str, Sequence[str], None] = "e5b9c3d7f2a8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "conversations",
+        sa.Column("last_activity_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.execute(
+        "UPDATE conversations "
+        "SET last_activity_at = COALESCE(last_message_at, created_at)"
+    )
+
+    with op.batch_alter_table("conversations") as batch_op:
+        batch_op.alter_column(
+            "last_activity_at",
+            existing_type=sa.DateTime(timezone=True),
+            nullable=False,
+        )
+
+    # Superseded by the composite index that leads with the same column
+    op.drop_index("ix_conversations_user2_id", table_name="conversations")
+    op.create_index(
+        "ix_conversations_user1_id_activity",
+        "conversations",
+        ["user1_id", "last_activity_at", "id"],
+    )
+    op.create_index(
+        "ix_conversations_user2_id_activity",
+        "conversations",
+        ["user2_id", "last_activity_at", "id"],
+    )
+
+    op.create_index(
+        "ix_conversation_settings_user_id_pinned",
+        "conversation_settings",
+        ["user_id"],
+        postgresql_where=sa.text("is_pinned"),
+        sqlite_where=sa.text("is_pinned"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_conversation_settings_user_id_pinned", table_name="conversation_settings"
+    )
+    op.drop_index("ix_conversations_user2_id_activity", table_name="conversations")
+    op.drop_index("ix_conversations_user1_id_activity", table_name="conversations")
+    op.create_index("ix_conversations_user2_id", "conversations", ["user2_id"])
+
+    with op.batch_alter_table("conversations") as batch_op:
+        batch_op.drop_column("last_activity_at")
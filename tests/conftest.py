@@ -5,7 +5,7 @@ from sqlalchemy.orm import sessionmaker
 from httpx import AsyncClient, ASGITransport
 
 from app.main import create_app
-from app.database.connection import get_db
+from app.database.connection import get_db, get_session_factory
 from app.database.base import Base
 from app.models.user_model import User  # noqa: F401
 from app.models.friendship_model import Friendship  # noqa: F401
@@ -49,6 +49,7 @@ def override_db(db):
         yield db
 
     app.dependency_overrides[get_db] = override
+    app.dependency_overrides[get_session_factory] = lambda: TestSessionLocal
 
 
 @pytest.fixture
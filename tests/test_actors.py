@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from app.websocket.actors import ConversationActors
+from app.websocket.manager import ConnectionManager
+
+
+@pytest.mark.asyncio
+async def test_actor_serializes_one_conversation_and_parallelizes_others():
+    actors = ConversationActors()
+    log = []
+
+    async def step(name: str, delay: float):
+        log.append(f"{name}:start")
+        await asyncio.sleep(delay)
+        log.append(f"{name}:end")
+
+    await asyncio.gather(
+        actors.run("c1", lambda: step("send", 0.02)),
+        actors.run("c1", lambda: step("read", 0)),
+        actors.run("c2", lambda: step("other", 0)),
+    )
+
+    # The read waited for the send; the other room did not
+    assert log.index("read:start") > log.index("send:end")
+    assert log.index("other:end") < log.index("send:end")
+
+    # Idle actors are gone once their mailbox drains
+    assert actors.stats() == {"active": 0, "queued": 0, "spawned": 2, "processed": 3}
+
+
+@pytest.mark.asyncio
+async def test_actor_returns_results_and_propagates_errors():
+    actors = ConversationActors()
+
+    async def fail():
+        raise ValueError("boom")
+
+    async def answer():
+        return 42
+
+    with pytest.raises(ValueError):
+        await actors.run("c1", fail)
+
+    assert await actors.run("c1", answer) == 42
+
+
+@pytest.mark.asyncio
+async def test_manager_runs_inline_without_actors():
+    manager = ConnectionManager()
+
+    async def answer():
+        return "inline"
+
+    assert manager.actors is None
+    assert await manager.run_in_conversation("c1", answer) == "inline"
+    assert "actors" not in manager.stats()
+    assert "actors" in ConnectionManager(conversation_actors=True).stats()
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import tempfile
+import uuid
+from datetime import datetime, UTC
+import pytest
+from app.websocket.backplane import UnixSocketBackplane
+from app.websocket.manager import ConnectionManager
+
+
+class FakeWebSocket:
+    scope: dict = {}
+    query_params: dict = {}
+
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, data: str):
+        self.sent.append(json.loads(data))
+
+
+@pytest.fixture
+async def worker_backplanes():
+    directory = tempfile.mkdtemp(prefix="bp-")
+    backplanes = [UnixSocketBackplane(directory) for _ in range(2)]
+
+    for backplane in backplanes:
+        await backplane.start()
+
+    yield backplanes
+
+    for backplane in backplanes:
+        await backplane.stop()
+
+
+@pytest.mark.asyncio
+async def test_unix_backplane_delivers_to_other_workers(worker_backplanes):
+    first, second = worker_backplanes
+    received = []
+
+    async def handler(message: dict):
+        received.append(message)
+
+    second.subscribe("chat", handler)
+
+    await first.publish("chat", {"target": "c1"})
+    await asyncio.sleep(0.05)
+
+    assert received == [{"target": "c1"}]
+
+
+@pytest.mark.asyncio
+async def test_unix_backplane_preserves_uuid_and_datetime(worker_backplanes):
+    first, second = worker_backplanes
+    received = []
+
+    async def handler(message: dict):
+        received.append(message)
+
+    second.subscribe("chat", handler)
+
+    message = {"id": uuid.uuid4(), "sent_at": datetime(2025, 1, 1, 12, tzinfo=UTC)}
+    await first.publish("chat", message)
+    await asyncio.sleep(0.05)
+
+    assert received == [message]
+
+
+@pytest.mark.asyncio
+async def test_room_broadcast_reaches_sockets_on_another_worker(worker_backplanes):
+    sender_worker = ConnectionManager(backplane=worker_backplanes[0])
+    receiver_worker = ConnectionManager(backplane=worker_backplanes[1])
+
+    alice = FakeWebSocket()
+    bob = FakeWebSocket()
+
+    await sender_worker.connect(alice, "alice")  # type: ignore
+    sender_worker.join_conversation(alice, "c1")  # type: ignore
+    await receiver_worker.connect(bob, "bob")  # type: ignore
+    receiver_worker.join_conversation(bob, "c1")  # type: ignore
+
+    await sender_worker.broadcast_typing("c1", "alice", True)
+    await asyncio.sleep(0.05)
+
+    expected = {
+        "event": "typing",
+        "conversation_id": "c1",
+        "user_id": "alice",
+        "is_typing": True,
+    }
+    assert alice.sent == [expected]
+    assert bob.sent == [expected]
+
+
+@pytest.mark.asyncio
+async def test_contacts_and_presence_are_shared_between_workers(worker_backplanes):
+    first = ConnectionManager(backplane=worker_backplanes[0])
+    second = ConnectionManager(backplane=worker_backplanes[1])
+    first.DISCONNECT_GRACE_SECONDS = 0
+
+    alice, bob = FakeWebSocket(), FakeWebSocket()
+    await second.connect(alice, "alice")  # type: ignore
+    await second.connect(bob, "bob")  # type: ignore
+
+    # A friendship accepted on another worker still links the two users
+    await first.broadcast_contact("alice", "bob")
+    await asyncio.sleep(0.05)
+
+    assert second.subscribers["bob"] == {"alice"}
+
+    # Alice's socket on the second worker keeps her online
+    assert await first.delayed_presence_check("alice") is None
+
+    second.disconnect(alice, "alice")  # type: ignore
+    assert await first.delayed_presence_check("alice") == "offline"
+
+
+@pytest.mark.asyncio
+async def test_reader_survives_malformed_datagrams(worker_backplanes):
+    import socket
+
+    first, second = worker_backplanes
+    received = []
+
+    async def handler(message: dict):
+        received.append(message)
+
+    second.subscribe("chat", handler)
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as rogue:
+        rogue.sendto(b"\xc1not an envelope", second.path)
+
+    await first.publish("chat", {"target": "c1"})
+    await asyncio.sleep(0.05)
+
+    assert received == [{"target": "c1"}]
@@ -0,0 +1,74 @@
+import uuid
+from datetime import datetime, UTC
+import pytest
+from app.websocket.codecs import (
+    JSON_CODEC,
+    MSGPACK_CODEC,
+    MSGPACK_SUBPROTOCOL,
+    negotiate_codec,
+)
+
+
+class FakeWebSocket:
+    def __init__(self, subprotocols: list[str]):
+        self.scope = {"subprotocols": subprotocols}
+
+
+@pytest.mark.skipif(MSGPACK_CODEC is None, reason="msgpack is not installed")
+def test_negotiates_msgpack_only_when_offered():
+    assert negotiate_codec(FakeWebSocket([])) is JSON_CODEC  # type: ignore
+    assert (
+        negotiate_codec(FakeWebSocket(["other", MSGPACK_SUBPROTOCOL]))  # type: ignore
+        is MSGPACK_CODEC
+    )
+
+
+@pytest.mark.skipif(MSGPACK_CODEC is None, reason="msgpack is not installed")
+def test_msgpack_encodes_uuid_and_datetime_compactly():
+    message_id = uuid.uuid4()
+    sent_at = datetime(2025, 1, 1, 12, 30, tzinfo=UTC)
+    payload = {"event": "new_message", "id": message_id, "sent_at": sent_at}
+
+    decoded = MSGPACK_CODEC.decode(MSGPACK_CODEC.encode(payload))  # type: ignore
+
+    assert decoded["id"] == message_id
+    assert decoded["sent_at"] == int(sent_at.timestamp() * 1000)
+    assert len(MSGPACK_CODEC.encode(payload)) < len(JSON_CODEC.encode(payload))  # type: ignore
+
+
+def test_json_codec_round_trip():
+    message_id = uuid.uuid4()
+    data = JSON_CODEC.encode({"event": "typing", "id": message_id})
+
+    assert JSON_CODEC.decode(data) == {"event": "typing", "id": str(message_id)}
+
+
+@pytest.mark.skipif(MSGPACK_CODEC is None, reason="msgpack is not installed")
+def test_join_builds_array_frames():
+    events = [{"event": "typing", "n": i} for i in range(20)]
+
+    json_frame = JSON_CODEC.join([JSON_CODEC.encode(e) for e in events])
+    msgpack_frame = MSGPACK_CODEC.join(  # type: ignore
+        [MSGPACK_CODEC.encode(e) for e in events]  # type: ignore
+    )
+
+    assert JSON_CODEC.decode(json_frame) == events
+    assert MSGPACK_CODEC.decode(msgpack_frame) == events  # type: ignore
+
+
+@pytest.mark.parametrize("use_msgpack", [True, False])
+def test_backplane_envelope_keeps_python_types(monkeypatch, use_msgpack):
+    from app.websocket import codecs
+
+    if use_msgpack and codecs.msgpack is None:
+        pytest.skip("msgpack is not installed")
+
+    if not use_msgpack:
+        monkeypatch.setattr(codecs, "msgpack", None)
+
+    envelope = {
+        "channel": "chat",
+        "message": {"id": uuid.uuid4(), "at": datetime(2025, 1, 1, tzinfo=UTC)},
+    }
+
+    assert codecs.unpack_envelope(codecs.pack_envelope(envelope)) == envelope
@@ -0,0 +1,302 @@
+import asyncio
+import json
+import pytest
+from app.websocket.connection import (
+    Connection,
+    OverflowPolicy,
+    SLOW_CONSUMER_CLOSE_CODE,
+)
+from app.websocket.manager import ConnectionManager
+
+
+class FakeWebSocket:
+    scope: dict = {}
+    query_params: dict = {}
+
+    def __init__(self, delay: float = 0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.sent = []
+        self.close_code = None
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, data: str):
+        await asyncio.sleep(self.delay)
+
+        if self.fail:
+            raise RuntimeError("socket closed")
+
+        self.sent.append(json.loads(data))
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+
+
+@pytest.mark.asyncio
+async def test_broadcast_removes_failed_and_slow_sockets():
+    manager = ConnectionManager()
+    manager.SEND_TIMEOUT_SECONDS = 0.05
+
+    healthy = FakeWebSocket()
+    broken = FakeWebSocket(fail=True)
+    stalled = FakeWebSocket(delay=1)
+
+    for user_id, ws in (("u1", healthy), ("u2", broken), ("u3", stalled)):
+        await manager.connect(ws, user_id)  # type: ignore
+        manager.join_conversation(ws, "c1")  # type: ignore
+
+    await manager.broadcast_to_conversation("c1", {"event": "new_message"})
+    await asyncio.sleep(0.1)
+
+    assert healthy.sent == [{"event": "new_message"}]
+    assert manager.conversations["c1"] == {healthy}
+    assert set(manager.active_users) == {"u1"}
+    assert stalled.close_code == SLOW_CONSUMER_CLOSE_CODE
+
+
+@pytest.mark.asyncio
+async def test_drop_low_value_policy_keeps_messages():
+    connection = Connection(
+        FakeWebSocket(),  # type: ignore
+        user_id="u1",
+        max_queue=2,
+        overflow_policy=OverflowPolicy.drop_low_value,
+    )
+
+    connection.send({"event": "typing"})
+    connection.send({"event": "new_message", "id": 1})
+    connection.send({"event": "new_message", "id": 2})
+
+    assert not connection.send({"event": "presence"})
+    assert [f.event for f in connection.pending()] == ["new_message", "new_message"]
+    assert connection.stats()["dropped"] == 2
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_policy():
+    connection = Connection(
+        FakeWebSocket(),  # type: ignore
+        user_id="u1",
+        max_queue=2,
+        overflow_policy=OverflowPolicy.drop_oldest,
+    )
+
+    for i in range(3):
+        connection.send({"event": "new_message", "id": i})
+
+    assert [json.loads(f.data)["id"] for f in connection.pending()] == [1, 2]
+    assert connection.dropped_count == 1
+
+
+@pytest.mark.asyncio
+async def test_disconnect_policy_closes_slow_consumer():
+    ws = FakeWebSocket()
+    connection = Connection(
+        ws,  # type: ignore
+        user_id="u1",
+        max_queue=1,
+        overflow_policy=OverflowPolicy.disconnect,
+    )
+
+    connection.send({"event": "new_message"})
+    assert not connection.send({"event": "new_message"})
+
+    await asyncio.sleep(0)
+
+    assert connection.closed
+    assert ws.close_code == SLOW_CONSUMER_CLOSE_CODE
+
+
+@pytest.mark.asyncio
+async def test_room_index_tracks_user_membership():
+    manager = ConnectionManager()
+    phone = FakeWebSocket()
+    laptop = FakeWebSocket()
+
+    await manager.connect(phone, "u1")  # type: ignore
+    await manager.connect(laptop, "u1")  # type: ignore
+    manager.join_conversation(phone, "c1")  # type: ignore
+    manager.join_conversation(laptop, "c1")  # type: ignore
+    manager.join_conversation(laptop, "c2")  # type: ignore
+
+    assert manager.is_user_in_conversation("u1", "c1")
+    assert manager.is_user_in_conversation("u1", "c2")
+
+    manager.disconnect(laptop, "u1")  # type: ignore
+
+    assert manager.is_user_in_conversation("u1", "c1")
+    assert not manager.is_user_in_conversation("u1", "c2")
+    assert "c2" not in manager.conversations
+
+    manager.disconnect(phone, "u1")  # type: ignore
+
+    assert not manager.is_user_in_conversation("u1", "c1")
+    assert manager.conversations == {}
+    assert manager.user_rooms == {}
+    assert manager.socket_rooms == {}
+
+
+@pytest.mark.asyncio
+async def test_presence_only_reaches_contacts():
+    manager = ConnectionManager()
+    sockets = {uid: FakeWebSocket() for uid in ("u1", "u2", "u3")}
+
+    for uid, ws in sockets.items():
+        await manager.connect(ws, uid)  # type: ignore
+
+    manager.set_contacts("u1", {"u2"})
+    manager.set_contacts("u2", {"u1"})
+
+    await manager.broadcast_presence("u2", "online")
+    await asyncio.sleep(0.01)
+    manager.add_contact("u3", "u2")
+    await manager.broadcast_presence("u2", "offline")
+    await asyncio.sleep(0.01)
+
+    assert [m["status"] for m in sockets["u1"].sent] == ["online", "offline"]
+    assert [m["status"] for m in sockets["u3"].sent] == ["offline"]
+    assert sockets["u2"].sent == []
+
+    manager.disconnect(sockets["u1"], "u1")  # type: ignore
+
+    assert manager.subscribers["u2"] == {"u3"}
+
+
+@pytest.mark.asyncio
+async def test_broadcast_encodes_payload_once():
+    import uuid
+    from datetime import datetime, UTC
+
+    manager = ConnectionManager()
+    sockets = [FakeWebSocket() for _ in range(3)]
+
+    for i, ws in enumerate(sockets):
+        await manager.connect(ws, f"u{i}")  # type: ignore
+        manager.join_conversation(ws, "c1")  # type: ignore
+
+    message_id = uuid.uuid4()
+    sent_at = datetime(2025, 1, 1, 12, 30, tzinfo=UTC)
+
+    await manager.broadcast_to_conversation(
+        "c1", {"event": "new_message", "data": {"id": message_id, "sent_at": sent_at}}
+    )
+
+    frames = {id(manager.connections[ws].pending()[0]) for ws in sockets}
+    assert len(frames) == 1
+
+    await asyncio.sleep(0.01)
+
+    assert sockets[0].sent[0]["data"] == {
+        "id": str(message_id),
+        "sent_at": sent_at.isoformat(),
+    }
+
+
+@pytest.mark.asyncio
+async def test_coalescing_sends_burst_as_one_ordered_frame():
+    ws = FakeWebSocket()
+    connection = Connection(ws, user_id="u1", coalesce_window=0.005)  # type: ignore
+    connection.start()
+
+    connection.send({"event": "new_message", "id": 1})
+    connection.send({"event": "unread_update", "unread": 1})
+    connection.send({"event": "notification", "id": 2})
+    await asyncio.sleep(0.05)
+
+    assert ws.sent == [
+        [
+            {"event": "new_message", "id": 1},
+            {"event": "unread_update", "unread": 1},
+            {"event": "notification", "id": 2},
+        ]
+    ]
+    assert connection.batch_count == 1
+
+    connection.stop()
+
+
+@pytest.mark.asyncio
+async def test_typing_stops_when_user_leaves_room():
+    manager = ConnectionManager()
+    manager.typing.MIN_INTERVAL_SECONDS = 0.05
+    typist = FakeWebSocket()
+    peer = FakeWebSocket()
+
+    await manager.connect(typist, "u1")  # type: ignore
+    await manager.connect(peer, "u2")  # type: ignore
+    manager.join_conversation(typist, "c1")  # type: ignore
+    manager.join_conversation(peer, "c1")  # type: ignore
+
+    manager.set_typing("c1", "u1", True)
+    manager.set_typing("c1", "u1", True)
+    await asyncio.sleep(0.01)
+
+    manager.disconnect(typist, "u1")  # type: ignore
+    await asyncio.sleep(manager.typing.MIN_INTERVAL_SECONDS + 0.05)
+
+    assert [m["is_typing"] for m in peer.sent] == [True, False]
+
+
+@pytest.mark.asyncio
+async def test_messages_jump_ahead_of_ephemeral_frames():
+    ws = FakeWebSocket()
+    connection = Connection(ws, user_id="u1", max_queue=4)  # type: ignore
+
+    for i in range(3):
+        connection.send({"event": "presence", "user_id": "u2", "status": str(i)})
+        connection.send(
+            {"event": "typing", "conversation_id": "c1", "user_id": "u2", "n": i}
+        )
+
+    connection.send({"event": "message_read", "id": 1})
+    connection.send({"event": "new_message", "id": 1})
+
+    assert [f.event for f in connection.pending()] == [
+        "new_message",
+        "message_read",
+        "presence",
+        "typing",
+    ]
+    assert connection.superseded_count == 4
+
+    connection.start()
+    await asyncio.sleep(0.01)
+
+    assert ws.sent[2] == {"event": "presence", "user_id": "u2", "status": "2"}
+    assert ws.sent[3]["n"] == 2
+
+    connection.stop()
+
+
+@pytest.mark.asyncio
+async def test_drop_low_value_sheds_lowest_class_first():
+    connection = Connection(
+        FakeWebSocket(),  # type: ignore
+        user_id="u1",
+        max_queue=2,
+        overflow_policy=OverflowPolicy.drop_low_value,
+    )
+
+    connection.send({"event": "new_message", "id": 1})
+    connection.send({"event": "unread_update", "unread": 1})
+    connection.send({"event": "new_message", "id": 2})
+
+    assert [f.event for f in connection.pending()] == ["new_message", "new_message"]
+    assert not connection.send({"event": "message_delivered", "id": 1})
+
+
+@pytest.mark.asyncio
+async def test_coalescing_sends_nothing_after_close():
+    ws = FakeWebSocket()
+    connection = Connection(ws, user_id="u1", coalesce_window=0.01)  # type: ignore
+    connection.start()
+
+    connection.send({"event": "new_message", "id": 1})
+    await asyncio.sleep(0)
+    connection._mark_closed()
+    await asyncio.sleep(0.03)
+
+    assert ws.sent == []
+    assert connection.batch_count == 0
@@ -35,3 +35,44 @@ async def test_conversation_info(client, db):
     assert data["unread_count"] == 0
     assert not data["is_muted"]
     assert not data["is_pinned"]
+
+
+@pytest.mark.asyncio
+async def test_conversation_info_agrees_with_the_list_on_the_last_message(client, db):
+    from app.services.conversation_service import ConversationService
+    from app.services.message_service import MessageService
+
+    alice = await UserService.create_user(
+        db, username="alice", email="alice@example.com", password="password"
+    )
+    bob = await UserService.create_user(
+        db, username="bob", email="bob@example.com", password="password"
+    )
+    conversation = await ConversationService.get_or_create_conversation(
+        db, user1_id=alice.id, user2_id=bob.id
+    )
+
+    first = await MessageService.send_message(
+        db, conversation=conversation, sender_id=alice.id, content="first"
+    )
+    second = await MessageService.send_message(
+        db, conversation=conversation, sender_id=bob.id, content="second"
+    )
+
+    # Same timestamp: only the pointer knows which one came last
+    second.sent_at = first.sent_at
+    await db.commit()
+
+    headers = {"Authorization": f"Bearer {create_access_token(str(alice.id))}"}
+
+    info = await client.get(f"/api/v1/conversations/{conversation.id}", headers=headers)
+    inbox = await client.get("/api/v1/conversations", headers=headers)
+
+    assert info.json()["last_message"]["id"] == str(second.id)
+    assert info.json()["last_message"] == inbox.json()[0]["last_message"]
+
+    await MessageService.delete_message(db, message_id=second.id, user_id=bob.id)
+
+    info = await client.get(f"/api/v1/conversations/{conversation.id}", headers=headers)
+
+    assert info.json()["last_message"]["id"] == str(first.id)
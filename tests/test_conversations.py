@@ -52,3 +52,158 @@ async def test_list_conversation(client, db):
 
     assert res.status_code == status.HTTP_200_OK
     assert len(res.json()) == 1
+
+
+@pytest.mark.asyncio
+async def test_list_follows_the_last_message_pointer(client, db):
+    from app.services.message_service import MessageService
+
+    alice = await UserService.create_user(
+        db, username="alice", email="alice@example.com", password="password"
+    )
+    bob = await UserService.create_user(
+        db, username="bob", email="bob@example.com", password="password"
+    )
+    carol = await UserService.create_user(
+        db, username="carol", email="carol@example.com", password="password"
+    )
+
+    with_bob = await ConversationService.get_or_create_conversation(
+        db, user1_id=alice.id, user2_id=bob.id
+    )
+    with_carol = await ConversationService.get_or_create_conversation(
+        db, user1_id=alice.id, user2_id=carol.id
+    )
+
+    first = await MessageService.send_message(
+        db, conversation=with_bob, sender_id=bob.id, content="hello"
+    )
+    latest = await MessageService.send_message(
+        db, conversation=with_bob, sender_id=bob.id, content="x" * 500
+    )
+    await MessageService.send_message(
+        db, conversation=with_carol, sender_id=carol.id, content="hi"
+    )
+
+    headers = {"Authorization": f"Bearer {create_access_token(str(alice.id))}"}
+
+    res = await client.get("/api/v1/conversations", headers=headers)
+    rows = res.json()
+
+    assert [row["id"] for row in rows] == [str(with_carol.id), str(with_bob.id)]
+    assert rows[1]["last_message"]["id"] == str(latest.id)
+    assert rows[1]["last_message"]["content"] == "x" * 200
+
+    await MessageService.edit_message(
+        db, message_id=latest.id, user_id=bob.id, new_content="edited"
+    )
+    res = await client.get("/api/v1/conversations", headers=headers)
+    assert res.json()[1]["last_message"]["content"] == "edited"
+
+    await MessageService.delete_message(db, message_id=latest.id, user_id=bob.id)
+    res = await client.get("/api/v1/conversations", headers=headers)
+    assert res.json()[1]["last_message"]["id"] == str(first.id)
+    assert res.json()[1]["last_message"]["content"] == "hello"
+
+
+@pytest.mark.asyncio
+async def test_list_pages_pinned_first_then_by_activity(client, db):
+    from app.services.conversation_settings_service import (
+        ConversationSettingsService,
+    )
+    from app.services.message_service import MessageService
+
+    alice = await UserService.create_user(
+        db, username="alice", email="alice@example.com", password="password"
+    )
+
+    conversations = []
+
+    for n in range(5):
+        friend = await UserService.create_user(
+            db, username=f"friend{n}", email=f"friend{n}@example.com", password="pw"
+        )
+        # Alice sits on both sides of the pair across conversations
+        pair = (alice.id, friend.id) if n % 2 else (friend.id, alice.id)
+        conversations.append(
+            await ConversationService.get_or_create_conversation(
+                db, user1_id=pair[0], user2_id=pair[1]
+            )
+        )
+
+    for conversation in (conversations[1], conversations[3], conversations[0]):
+        await MessageService.send_message(
+            db, conversation=conversation, sender_id=alice.id, content="hi"
+        )
+
+    await ConversationSettingsService.toggle_pin(
+        db, conversation_id=conversations[3].id, user_id=alice.id, pin=True
+    )
+
+    headers = {"Authorization": f"Bearer {create_access_token(str(alice.id))}"}
+    pages, cursor = [], None
+
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        res = await client.get("/api/v1/conversations", params=params, headers=headers)
+        pages.append([row["id"] for row in res.json()])
+
+        cursor = res.headers.get("X-Next-Cursor")
+
+        if not cursor:
+            break
+
+    ids = [str(c.id) for c in conversations]
+    assert pages == [[ids[3], ids[0]], [ids[1], ids[4]], [ids[2]]]
+
+
+@pytest.mark.asyncio
+async def test_list_embeds_the_other_user_in_one_query(client, db):
+    from sqlalchemy import event
+    from app.websocket.state import connection_manager
+
+    alice = await UserService.create_user(
+        db, username="alice", email="alice@example.com", password="password"
+    )
+    bob = await UserService.create_user(
+        db, username="bob", email="bob@example.com", password="password"
+    )
+    carol = await UserService.create_user(
+        db, username="carol", email="carol@example.com", password="password"
+    )
+
+    await ConversationService.get_or_create_conversation(
+        db, user1_id=alice.id, user2_id=bob.id
+    )
+    await ConversationService.get_or_create_conversation(
+        db, user1_id=carol.id, user2_id=alice.id
+    )
+
+    connection_manager.active_users[str(bob.id)] = set()
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        if "FROM conversations" in statement:
+            statements.append(statement)
+
+    engine = db.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", count)
+
+    try:
+        res = await client.get(
+            "/api/v1/conversations",
+            params={"with_user": True},
+            headers={"Authorization": f"Bearer {create_access_token(str(alice.id))}"},
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+        connection_manager.active_users.pop(str(bob.id), None)
+
+    assert res.status_code == status.HTTP_200_OK
+    assert len(statements) == 1
+
+    others = {row["other_user"]["username"]: row["other_user"] for row in res.json()}
+
+    assert set(others) == {"bob", "carol"}
+    assert others["bob"]["id"] == str(bob.id) and others["bob"]["is_online"]
+    assert others["carol"]["id"] == str(carol.id) and not others["carol"]["is_online"]
@@ -0,0 +1,26 @@
+from datetime import datetime, UTC
+import pytest
+from app.core.exceptions import AppException
+from app.utils.datetime_util import parse_timestamp
+
+EXPECTED = datetime(2025, 1, 1, 12, 30, 5, tzinfo=UTC)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        int(EXPECTED.timestamp() * 1000),
+        "2025-01-01T12:30:05+00:00",
+        "2025-01-01 12:30:05",
+        "2025-01-01T14:30:05+02:00",
+        EXPECTED,
+    ],
+)
+def test_parse_timestamp_accepts_every_wire_format(value):
+    assert parse_timestamp(value) == EXPECTED
+
+
+@pytest.mark.parametrize("value", [None, "yesterday", True])
+def test_parse_timestamp_rejects_garbage(value):
+    with pytest.raises(AppException):
+        parse_timestamp(value)
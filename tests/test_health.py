@@ -7,3 +7,32 @@ async def test_health_check(client):
     response = await client.get("/health")
     assert response.status_code == status.HTTP_200_OK
     assert response.json() == {"status": "ok"}
+
+
+@pytest.mark.asyncio
+async def test_websocket_health_reports_aggregates_only(client):
+    from app.websocket.connection import Connection, OverflowPolicy
+    from app.websocket.state import connection_manager
+    from tests.test_connection_manager import FakeWebSocket
+
+    ws = FakeWebSocket()
+    connection = Connection(
+        ws,  # type: ignore
+        user_id="secret-user",
+        max_queue=1,
+        overflow_policy=OverflowPolicy.drop_oldest,
+    )
+    connection.send({"event": "new_message", "id": 1})
+    connection.send({"event": "new_message", "id": 2})
+    connection_manager.connections[ws] = connection  # type: ignore
+
+    try:
+        response = await client.get("/health/ws")
+    finally:
+        del connection_manager.connections[ws]  # type: ignore
+
+    chat = response.json()["chat"]
+
+    assert response.status_code == status.HTTP_200_OK
+    assert chat["slow_consumers"] == 1 and chat["overflows"] == 1
+    assert "secret-user" not in response.text
@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+from fastapi import WebSocketDisconnect
+from app.websocket.connection import Connection, HEARTBEAT_TIMEOUT_CLOSE_CODE
+from app.websocket.heartbeat import Heartbeat
+from app.websocket.manager import ConnectionManager
+from app.websocket.notification_manager import NotificationManager
+from tests.test_connection_manager import FakeWebSocket
+
+
+class IdleWebSocket(FakeWebSocket):
+    """A half-open socket: inbound frames only arrive when fed."""
+
+    def __init__(self):
+        super().__init__()
+        self.inbound: asyncio.Queue = asyncio.Queue()
+
+    async def receive(self):
+        return await self.inbound.get()
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_pings_idle_and_reaps_unresponsive_sockets():
+    manager = ConnectionManager()
+    notifications = NotificationManager()
+    heartbeat = Heartbeat(managers=[manager, notifications], interval=5, timeout=10)
+
+    fresh, idle, dead = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+    legacy = FakeWebSocket()
+
+    for ws in (fresh, idle, dead):
+        ws.query_params = {"heartbeat": "1"}
+
+    sockets = (("u1", fresh), ("u2", idle), ("u3", dead), ("u4", legacy))
+
+    for user_id, ws in sockets:
+        await manager.connect(ws, user_id)  # type: ignore
+        manager.join_conversation(ws, "c1")  # type: ignore
+
+    # A gateway socket is shared with the notification manager
+    notifications.attach(manager.connections[idle])  # type: ignore
+
+    manager.connections[idle].last_seen -= 6  # type: ignore
+    manager.connections[dead].last_seen -= 11  # type: ignore
+
+    # Never opted in, so left to protocol-level pings
+    manager.connections[legacy].last_seen -= 11  # type: ignore
+
+    await heartbeat.tick()
+    await asyncio.sleep(0.01)
+
+    assert fresh.sent == []
+    assert idle.sent == [{"event": "ping"}]
+    assert dead.close_code == HEARTBEAT_TIMEOUT_CLOSE_CODE
+    assert legacy.sent == [] and legacy.close_code is None
+    assert manager.conversations["c1"] == {fresh, idle, legacy}
+    assert heartbeat.stats()["pings_sent"] == 1
+    assert heartbeat.stats()["reaped"] == 1
+
+
+@pytest.mark.asyncio
+async def test_receive_answers_heartbeat_frames_and_wakes_on_reap():
+    ws = IdleWebSocket()
+    connection = Connection(ws, user_id="u1")  # type: ignore
+    connection.start()
+    connection.last_seen -= 30
+
+    await ws.inbound.put({"type": "websocket.receive", "text": '{"event":"pong"}'})
+    await ws.inbound.put({"type": "websocket.receive", "text": '{"event":"ping"}'})
+    await ws.inbound.put({"type": "websocket.receive", "text": '{"event":"hi"}'})
+
+    assert await connection.receive() == {"event": "hi"}
+    assert connection.heartbeat
+    assert connection.stats()["idle_seconds"] < 1
+
+    await asyncio.sleep(0.01)
+    assert ws.sent == [{"event": "pong"}]
+
+    reader = asyncio.create_task(connection.receive())
+    await asyncio.sleep(0.01)
+    await connection.close(code=HEARTBEAT_TIMEOUT_CLOSE_CODE)
+
+    with pytest.raises(WebSocketDisconnect) as disconnect:
+        await reader
+
+    assert disconnect.value.code == HEARTBEAT_TIMEOUT_CLOSE_CODE
@@ -2,6 +2,7 @@ import pytest
 from fastapi import status
 from app.services.user_service import UserService
 from app.services.conversation_service import ConversationService
+from app.services.message_service import MessageService
 from app.utils.jwt_util import create_access_token
 
 
@@ -62,3 +63,244 @@ async def test_list_message(client, db):
 
     assert res.status_code == status.HTTP_200_OK
     assert len(res.json()) == 1
+
+
+@pytest.mark.asyncio
+async def test_catch_up_is_scoped_to_the_user_and_paged(db):
+    from datetime import datetime, UTC, timedelta
+
+    alice = await UserService.create_user(
+        db, username="alice", email="alice@example.com", password="password"
+    )
+    bob = await UserService.create_user(
+        db, username="bob", email="bob@example.com", password="password"
+    )
+    carol = await UserService.create_user(
+        db, username="carol", email="carol@example.com", password="password"
+    )
+
+    ours = await ConversationService.get_or_create_conversation(
+        db, user1_id=alice.id, user2_id=bob.id
+    )
+    theirs = await ConversationService.get_or_create_conversation(
+        db, user1_id=bob.id, user2_id=carol.id
+    )
+
+    since = datetime.now(UTC) - timedelta(minutes=1)
+
+    for n in range(5):
+        await MessageService.send_message(
+            db, conversation=ours, sender_id=bob.id, content=f"to alice {n}"
+        )
+        await MessageService.send_message(
+            db, conversation=theirs, sender_id=bob.id, content=f"to carol {n}"
+        )
+
+    pages, cursor = [], None
+
+    while True:
+        page, cursor = await MessageService.list_messages_since(
+            db, user_id=alice.id, timestamp=since, cursor=cursor, limit=2
+        )
+        pages.append([m.content for m in page])
+
+        if not cursor:
+            break
+
+    assert pages == [
+        ["to alice 0", "to alice 1"],
+        ["to alice 2", "to alice 3"],
+        ["to alice 4"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_resume_by_seq_replays_only_missed_messages(db):
+    from app.websocket.handlers.reconnect_handler import handle_reconnect
+    from app.websocket.recent_messages import RecentMessages
+
+    class RecordingManager:
+        def __init__(self):
+            self.sent = []
+            # Nothing cached, so the replay comes from the database
+            self.recent = RecentMessages()
+
+        async def send_to_socket(self, websocket, message):
+            self.sent.append(message)
+
+    alice = await UserService.create_user(
+        db, username="alice", email="alice@example.com", password="password"
+    )
+    bob = await UserService.create_user(
+        db, username="bob", email="bob@example.com", password="password"
+    )
+    conversation = await ConversationService.get_or_create_conversation(
+        db, user1_id=alice.id, user2_id=bob.id
+    )
+
+    sent = [
+        await MessageService.send_message(
+            db, conversation=conversation, sender_id=bob.id, content=f"m{n}"
+        )
+        for n in range(4)
+    ]
+    assert [m.seq for m in sent] == [1, 2, 3, 4]
+
+    manager = RecordingManager()
+    await handle_reconnect(
+        data={"last_seq": {str(conversation.id): 2}},
+        websocket=None,  # type: ignore
+        user=alice,
+        conversation=conversation,
+        conversation_id=str(conversation.id),
+        manager=manager,  # type: ignore
+        db=db,
+    )
+
+    missed, done = manager.sent
+    assert [m["seq"] for m in missed["messages"]] == [3, 4]
+    assert done["conversations"][str(conversation.id)] == {
+        "seq": 4,
+        "last_seq": 4,
+        "has_more": False,
+        "resync": False,
+    }
+    assert done["gaps"] == []
+
+
+@pytest.mark.asyncio
+async def test_history_of_an_active_conversation_skips_the_database(client, db):
+    from app.websocket.state import connection_manager
+
+    alice = await UserService.create_user(
+        db, username="alice", email="alice@example.com", password="password"
+    )
+    bob = await UserService.create_user(
+        db, username="bob", email="bob@example.com", password="password"
+    )
+    conversation = await ConversationService.get_or_create_conversation(
+        db, user1_id=alice.id, user2_id=bob.id
+    )
+
+    headers = {"Authorization": f"Bearer {create_access_token(str(alice.id))}"}
+
+    for content in ("one", "two"):
+        await client.post(
+            f"/api/v1/messages/{conversation.id}",
+            json={"content": content},
+            headers=headers,
+        )
+
+    hits = connection_manager.recent.hits
+
+    res = await client.get(f"/api/v1/messages/{conversation.id}", headers=headers)
+
+    assert [m["content"] for m in res.json()] == ["two", "one"]
+    assert [m["seq"] for m in res.json()] == [2, 1]
+    assert connection_manager.recent.hits == hits + 1
+
+
+@pytest.mark.asyncio
+async def test_history_pages_by_seq_newest_first(client, db):
+    alice = await UserService.create_user(
+        db, username="alice", email="alice@example.com", password="password"
+    )
+    bob = await UserService.create_user(
+        db, username="bob", email="bob@example.com", password="password"
+    )
+    conversation = await ConversationService.get_or_create_conversation(
+        db, user1_id=alice.id, user2_id=bob.id
+    )
+
+    sent = [
+        await MessageService.send_message(
+            db, conversation=conversation, sender_id=bob.id, content=f"m{n}"
+        )
+        for n in range(1, 6)
+    ]
+
+    headers = {"Authorization": f"Bearer {create_access_token(str(alice.id))}"}
+    url = f"/api/v1/messages/{conversation.id}"
+
+    async def seqs(**params):
+        res = await client.get(url, params=params, headers=headers)
+        assert res.status_code == status.HTTP_200_OK, res.json()
+        return [m["seq"] for m in res.json()]
+
+    assert await seqs(limit=2) == [5, 4]
+    assert await seqs(before=4, limit=2) == [3, 2]
+    assert await seqs(before=2, limit=2) == [1]
+    assert await seqs(after=1, limit=2) == [3, 2]
+    assert await seqs(around=str(sent[2].id), limit=3) == [4, 3, 2]
+
+    res = await client.get(url, params={"before": 3, "after": 1}, headers=headers)
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+    res = await client.get(url, params={"limit": 1000}, headers=headers)
+    assert res.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+
+
+@pytest.mark.asyncio
+async def test_write_paths_push_inbox_deltas(db, monkeypatch):
+    from app.services.conversation_settings_service import (
+        ConversationSettingsService,
+    )
+    from app.services.unread_service import UnreadService
+    from app.websocket.state import notification_manager
+
+    alice = await UserService.create_user(
+        db, username="alice", email="alice@example.com", password="password"
+    )
+    bob = await UserService.create_user(
+        db, username="bob", email="bob@example.com", password="password"
+    )
+    conversation = await ConversationService.get_or_create_conversation(
+        db, user1_id=alice.id, user2_id=bob.id
+    )
+    conversation_id = str(conversation.id)
+
+    pushed = []
+
+    async def record(user_id, payload):
+        if payload["event"] == "inbox_delta":
+            assert payload.pop("conversation_id") == conversation_id
+            pushed.append((user_id, {k: v for k, v in payload.items() if k != "event"}))
+
+    monkeypatch.setattr(notification_manager, "send_notifications", record)
+
+    first = await MessageService.send_message(
+        db, conversation=conversation, sender_id=alice.id, content="hi"
+    )
+
+    preview = {
+        "id": str(first.id),
+        "sender_id": str(alice.id),
+        "content": "hi",
+        "sent_at": first.sent_at.isoformat(),
+    }
+    moved = {"last_message": preview, "last_activity_at": first.sent_at.isoformat()}
+
+    assert pushed == [
+        (str(alice.id), moved),
+        (str(bob.id), moved),
+        (str(bob.id), {"unread_count": 1}),
+    ]
+
+    pushed.clear()
+    await MessageService.delete_message(db, message_id=first.id, user_id=alice.id)
+    await UnreadService.reset(db, conversation_id=conversation.id, user_id=bob.id)
+    await UnreadService.reset(db, conversation_id=conversation.id, user_id=bob.id)
+    await ConversationSettingsService.toggle_pin(
+        db, conversation_id=conversation.id, user_id=bob.id, pin=True
+    )
+    await ConversationSettingsService.toggle_mute(
+        db, conversation_id=conversation.id, user_id=bob.id, mute=False
+    )
+
+    # An unchanged counter or setting is not pushed again
+    assert pushed == [
+        (str(alice.id), {"last_message": None}),
+        (str(bob.id), {"last_message": None}),
+        (str(bob.id), {"unread_count": 0}),
+        (str(bob.id), {"is_pinned": True}),
+    ]
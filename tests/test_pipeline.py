@@ -0,0 +1,146 @@
+import asyncio
+import pytest
+from app.websocket.events import event_lane
+from app.websocket.pipeline import EventPipeline
+
+
+@pytest.mark.asyncio
+async def test_pipeline_orders_lanes_and_runs_immediate_events_first():
+    pipeline = EventPipeline(max_in_flight=8)
+    finished = []
+    release = asyncio.Event()
+
+    async def slow(name):
+        await release.wait()
+        finished.append(name)
+
+    async def fast(name):
+        finished.append(name)
+
+    await pipeline.submit(("conversation", "c1"), lambda: slow("send_1"))
+    await pipeline.submit(("conversation", "c1"), lambda: fast("send_2"))
+    await pipeline.submit(("message", "m1"), lambda: fast("read_m1"))
+    await pipeline.submit(None, lambda: fast("typing_stop"))
+    await asyncio.sleep(0.01)
+
+    assert finished == ["typing_stop", "read_m1"]
+    assert pipeline.in_flight == 2
+
+    release.set()
+    await pipeline.close()
+
+    assert finished == ["typing_stop", "read_m1", "send_1", "send_2"]
+    assert pipeline.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_pipeline_bounds_in_flight_events():
+    pipeline = EventPipeline(max_in_flight=2)
+    release = asyncio.Event()
+
+    async def blocked():
+        await release.wait()
+
+    await pipeline.submit(("conversation", "c1"), blocked)
+    await pipeline.submit(("conversation", "c2"), blocked)
+
+    third = asyncio.create_task(pipeline.submit(("conversation", "c3"), blocked))
+    await asyncio.sleep(0.01)
+    assert not third.done()
+
+    release.set()
+    await third
+    await pipeline.close()
+
+
+def test_event_lanes():
+    assert event_lane("typing_start", {}, "c1") is None
+    assert event_lane("message_read", {"message_id": "m1"}, "c1") == ("message", "m1")
+    assert event_lane("send_message", {}, "c1") == ("conversation", "c1")
+
+
+class FakeSession:
+    def __init__(self):
+        self.rollbacks = 0
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+class RecordingManager:
+    def __init__(self):
+        self.sent = []
+
+    async def send_to_socket(self, websocket, message):
+        self.sent.append(message)
+
+
+@pytest.mark.asyncio
+async def test_failed_event_rolls_back_and_reports_error(monkeypatch):
+    from app.core.exceptions import AppException
+    from app.websocket import events
+
+    async def rejected(**kwargs):
+        raise AppException("Message not found")
+
+    async def broken(**kwargs):
+        raise ValueError("bad timestamp")
+
+    monkeypatch.setitem(events.event_handlers, "message_edit", rejected)
+    monkeypatch.setitem(events.event_handlers, "send_message", broken)
+
+    db, manager = FakeSession(), RecordingManager()
+
+    for event_name in ("message_edit", "send_message"):
+        await events.dispatch_event(
+            event_name=event_name,
+            data={},
+            websocket=None,  # type: ignore
+            user=None,  # type: ignore
+            conversation=None,  # type: ignore
+            conversation_id="c1",
+            manager=manager,  # type: ignore
+            db=db,  # type: ignore
+        )
+
+    assert db.rollbacks == 2
+    assert manager.sent == [
+        {"event": "error", "message": "Message not found"},
+        {"event": "error", "message": "Could not process send_message"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_each_event_gets_its_own_session(monkeypatch):
+    from contextlib import asynccontextmanager
+    from app.websocket import events
+
+    opened, seen = [], []
+
+    @asynccontextmanager
+    async def sessions():
+        session = FakeSession()
+        opened.append(session)
+        yield session
+
+    async def record(db, **kwargs):
+        seen.append(db)
+
+    monkeypatch.setitem(events.event_handlers, "typing_start", record)
+    monkeypatch.setitem(events.event_handlers, "send_message", record)
+
+    for event_name in ("typing_start", "send_message", "send_message"):
+        await events.run_event(
+            event_name=event_name,
+            data={},
+            websocket=None,  # type: ignore
+            user=None,  # type: ignore
+            conversation=None,  # type: ignore
+            conversation_id="c1",
+            manager=RecordingManager(),  # type: ignore
+            sessions=sessions,  # type: ignore
+        )
+
+    # Typing never checks a session out; every DB event opens a fresh one
+    assert seen == [None, *opened]
+    assert len(opened) == 2 and opened[0] is not opened[1]
@@ -0,0 +1,38 @@
+import pytest
+from app.services.user_service import UserService
+from app.services.conversation_service import ConversationService
+from app.services.friend_service import FriendService
+
+
+@pytest.mark.asyncio
+async def test_contact_ids_cover_partners_and_friends(db):
+    alice = await UserService.create_user(
+        db, username="alice", email="alice@example.com", password="password"
+    )
+    bob = await UserService.create_user(
+        db, username="bob", email="bob@example.com", password="password"
+    )
+    carol = await UserService.create_user(
+        db, username="carol", email="carol@example.com", password="password"
+    )
+    dave = await UserService.create_user(
+        db, username="dave", email="dave@example.com", password="password"
+    )
+
+    await ConversationService.get_or_create_conversation(
+        db, user1_id=bob.id, user2_id=alice.id
+    )
+
+    accepted = await FriendService.send_request(
+        db, requester_id=carol.id, receiver_id=alice.id
+    )
+    await FriendService.accept_request(db, friendship_id=accepted.id, user_id=alice.id)
+
+    # Pending requests do not subscribe to presence
+    await FriendService.send_request(db, requester_id=alice.id, receiver_id=dave.id)
+
+    partner_ids = await ConversationService.list_partner_ids(db, user_id=alice.id)
+    friend_ids = await FriendService.list_friend_ids(db, user_id=alice.id)
+
+    assert partner_ids == {str(bob.id)}
+    assert friend_ids == {str(carol.id)}
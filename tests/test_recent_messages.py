@@ -0,0 +1,75 @@
+from app.websocket.recent_messages import RecentMessages
+
+
+def entry(seq: int, content: str = "hi", sender: str = "a", receiver: str = "b"):
+    return {
+        "seq": seq,
+        "sender_id": sender,
+        "receiver_id": receiver,
+        "content": content,
+    }
+
+
+def test_serves_contiguous_ranges_and_misses_on_holes():
+    recent = RecentMessages(per_conversation=3)
+
+    for seq in (1, 2, 4):
+        recent.record("c1", entry(seq), new=True)
+
+    last_seq, page = recent.after_seq("c1", "a", after_seq=0, limit=2)  # type: ignore
+    assert last_seq == 4 and [e["seq"] for e in page] == [1, 2]
+
+    # 3 was committed but its record has not arrived yet
+    assert recent.after_seq("c1", "a", after_seq=2, limit=10) is None
+    assert recent.after_seq("c1", "stranger", after_seq=0, limit=2) is None
+
+    recent.record("c1", entry(3), new=True)
+
+    # The ring keeps the newest three, so seq 1 is gone
+    assert recent.after_seq("c1", "b", after_seq=0, limit=10) is None
+    _, page = recent.after_seq("c1", "b", after_seq=1, limit=10)  # type: ignore
+    assert [e["seq"] for e in page] == [2, 3, 4]
+
+    assert recent.stats()["hits"] == 2
+    assert recent.stats()["misses"] == 3
+
+
+def test_updates_replace_cached_entries_only():
+    recent = RecentMessages()
+
+    recent.record("c1", entry(1), new=True)
+    recent.record("c1", entry(1, content="edited"))
+    recent.record("c1", entry(7, content="never cached"))
+    recent.record("c2", entry(1, content="never cached"))
+
+    _, page = recent.after_seq("c1", "a", after_seq=0, limit=10)  # type: ignore
+    assert [e["content"] for e in page] == ["edited"]
+    assert recent.stats()["conversations"] == 1
+
+
+def test_evicts_least_recently_used_conversations_past_the_byte_cap():
+    recent = RecentMessages(max_bytes=3 * (512 + 2))
+
+    for conversation_id in ("c1", "c2", "c3"):
+        recent.record(conversation_id, entry(1), new=True)
+
+    # Reading c1 makes c2 the least recently used
+    recent.after_seq("c1", "a", after_seq=0, limit=1)
+    recent.record("c4", entry(1), new=True)
+
+    assert recent.after_seq("c2", "a", after_seq=0, limit=1) is None
+    assert recent.after_seq("c1", "a", after_seq=0, limit=1) is not None
+    assert recent.stats()["evictions"] == 1
+
+
+def test_newest_first_pages_need_every_seq_they_cover():
+    recent = RecentMessages()
+
+    for seq in (3, 4, 5):
+        recent.record("c1", entry(seq), new=True)
+
+    page = recent.before_seq("c1", "a", before_seq=None, limit=2)
+    assert [e["seq"] for e in page] == [5, 4]  # type: ignore
+
+    # Seqs 1 and 2 predate the buffer
+    assert recent.before_seq("c1", "a", before_seq=4, limit=2) is None
@@ -0,0 +1,123 @@
+import pytest
+from datetime import datetime, timedelta, UTC
+from sqlalchemy import update
+from app.models.conversation_model import Conversation
+from app.models.conversation_settings_model import ConversationSettings
+from app.models.friendship_model import Friendship
+from app.models.unread_model import ConversationUnread
+from app.services import sync_service
+from app.services.conversation_service import ConversationService
+from app.services.conversation_settings_service import ConversationSettingsService
+from app.services.friend_service import FriendService
+from app.services.message_service import MessageService
+from app.services.user_service import UserService
+from app.utils.jwt_util import create_access_token
+
+
+async def _backdate(db):
+    """Age every row past the sync overlap, as if the last sync was long ago."""
+
+    an_hour_ago = datetime.now(UTC) - timedelta(hours=1)
+
+    for model in (Conversation, ConversationUnread, ConversationSettings, Friendship):
+        await db.execute(update(model).values(updated_at=an_hour_ago))
+
+    await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_sync_returns_only_rows_changed_since_the_token(client, db):
+    alice = await UserService.create_user(
+        db, username="alice", email="alice@example.com", password="password"
+    )
+    bob = await UserService.create_user(
+        db, username="bob", email="bob@example.com", password="password"
+    )
+    carol = await UserService.create_user(
+        db, username="carol", email="carol@example.com", password="password"
+    )
+
+    with_bob = await ConversationService.get_or_create_conversation(
+        db, user1_id=alice.id, user2_id=bob.id
+    )
+    with_carol = await ConversationService.get_or_create_conversation(
+        db, user1_id=carol.id, user2_id=alice.id
+    )
+
+    headers = {"Authorization": f"Bearer {create_access_token(str(alice.id))}"}
+
+    res = await client.get("/api/v1/sync", headers=headers)
+    full = res.json()
+
+    assert res.status_code == 200 and not full["reset"]
+    assert {c["id"] for c in full["conversations"]} == {
+        str(with_bob.id),
+        str(with_carol.id),
+    }
+
+    await _backdate(db)
+
+    await MessageService.send_message(
+        db, conversation=with_bob, sender_id=bob.id, content="hello"
+    )
+    await ConversationSettingsService.toggle_mute(
+        db, conversation_id=with_carol.id, user_id=alice.id, mute=True
+    )
+    friendship = await FriendService.send_request(
+        db, requester_id=carol.id, receiver_id=alice.id
+    )
+
+    res = await client.get(
+        "/api/v1/sync", params={"token": full["token"]}, headers=headers
+    )
+    delta = res.json()
+
+    assert [c["id"] for c in delta["conversations"]] == [str(with_bob.id)]
+    assert delta["conversations"][0]["last_message"]["content"] == "hello"
+    assert [(u["conversation_id"], u["unread_count"]) for u in delta["unread"]] == [
+        (str(with_bob.id), 1)
+    ]
+    assert [(s["conversation_id"], s["is_muted"]) for s in delta["settings"]] == [
+        (str(with_carol.id), True)
+    ]
+    assert [f["id"] for f in delta["friendships"]] == [str(friendship.id)]
+
+
+@pytest.mark.asyncio
+async def test_sync_asks_for_a_reload_past_the_change_limit(client, db, monkeypatch):
+    monkeypatch.setattr(sync_service, "SYNC_MAX_CHANGES", 1)
+
+    alice = await UserService.create_user(
+        db, username="alice", email="alice@example.com", password="password"
+    )
+
+    for name in ("bob", "carol"):
+        friend = await UserService.create_user(
+            db, username=name, email=f"{name}@example.com", password="password"
+        )
+        await ConversationService.get_or_create_conversation(
+            db, user1_id=alice.id, user2_id=friend.id
+        )
+
+    res = await client.get(
+        "/api/v1/sync",
+        headers={"Authorization": f"Bearer {create_access_token(str(alice.id))}"},
+    )
+
+    assert res.json()["reset"] and res.json()["token"]
+    assert res.json()["conversations"] == []
+
+
+@pytest.mark.asyncio
+async def test_sync_rejects_a_malformed_token(client, db):
+    alice = await UserService.create_user(
+        db, username="alice", email="alice@example.com", password="password"
+    )
+
+    res = await client.get(
+        "/api/v1/sync",
+        params={"token": "not-a-token"},
+        headers={"Authorization": f"Bearer {create_access_token(str(alice.id))}"},
+    )
+
+    assert res.status_code == 400
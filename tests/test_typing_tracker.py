@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+from app.websocket.typing_tracker import TypingTracker
+
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+
+    async def __call__(self, conversation_id: str, user_id: str, is_typing: bool):
+        self.events.append(is_typing)
+
+
+@pytest.fixture
+def tracker():
+    recorder = Recorder()
+    tracker = TypingTracker(emit=recorder)
+    tracker.TTL_SECONDS = 0.1
+    tracker.MIN_INTERVAL_SECONDS = 0.05
+
+    return tracker, recorder
+
+
+@pytest.mark.asyncio
+async def test_repeated_starts_collapse_into_one_event(tracker):
+    tracker, recorder = tracker
+
+    for _ in range(10):
+        tracker.start("c1", "u1")
+        await asyncio.sleep(0.005)
+
+    assert recorder.events == [True]
+    assert tracker.is_typing("c1", "u1")
+
+
+@pytest.mark.asyncio
+async def test_typing_expires_after_ttl(tracker):
+    tracker, recorder = tracker
+
+    tracker.start("c1", "u1")
+    await asyncio.sleep(0.2)
+
+    assert recorder.events == [True, False]
+    assert not tracker.is_typing("c1", "u1")
+
+
+@pytest.mark.asyncio
+async def test_flapping_is_throttled_to_final_state(tracker):
+    tracker, recorder = tracker
+
+    tracker.start("c1", "u1")
+    tracker.stop("c1", "u1")
+    tracker.start("c1", "u1")
+    tracker.stop("c1", "u1")
+    await asyncio.sleep(0.01)
+
+    assert recorder.events == [True]
+
+    await asyncio.sleep(0.1)
+
+    assert recorder.events == [True, False]
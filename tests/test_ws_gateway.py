@@ -0,0 +1,88 @@
+import pytest
+from starlette.testclient import TestClient
+from app.services.user_service import UserService
+from app.services.conversation_service import ConversationService
+from app.utils.jwt_util import create_access_token
+from tests.conftest import app
+
+
+@pytest.mark.asyncio
+async def test_gateway_multiplexes_conversations(db):
+    alice = await UserService.create_user(
+        db, username="alice", email="alice@example.com", password="password"
+    )
+    bob = await UserService.create_user(
+        db, username="bob", email="bob@example.com", password="password"
+    )
+    conversation = await ConversationService.get_or_create_conversation(
+        db, user1_id=alice.id, user2_id=bob.id
+    )
+
+    carol = await UserService.create_user(
+        db, username="carol", email="carol@example.com", password="password"
+    )
+
+    token = create_access_token(str(alice.id))
+    carol_token = create_access_token(str(carol.id))
+
+    with TestClient(app) as client:
+        with client.websocket_connect(f"/ws?token={token}") as ws:
+            ws.send_json(
+                {"event": "subscribe", "conversation_id": str(conversation.id)}
+            )
+            assert ws.receive_json() == {
+                "event": "subscribed",
+                "conversation_id": str(conversation.id),
+            }
+
+            ws.send_json(
+                {"event": "typing_start", "conversation_id": str(conversation.id)}
+            )
+            assert ws.receive_json() == {
+                "event": "typing",
+                "conversation_id": str(conversation.id),
+                "user_id": str(alice.id),
+                "is_typing": True,
+            }
+
+            # Notifications share the same socket
+            client.post(
+                f"/api/v1/friends/request?receiver_id={alice.id}",
+                headers={"Authorization": f"Bearer {carol_token}"},
+            )
+            notification = ws.receive_json()
+
+            assert notification["type"] == "friend_request"
+            assert notification["from_user_id"] == str(carol.id)
+
+
+@pytest.mark.asyncio
+async def test_gateway_reconnects_without_subscriptions(db):
+    from app.services.message_service import MessageService
+
+    alice = await UserService.create_user(
+        db, username="alice", email="alice@example.com", password="password"
+    )
+    bob = await UserService.create_user(
+        db, username="bob", email="bob@example.com", password="password"
+    )
+    conversation = await ConversationService.get_or_create_conversation(
+        db, user1_id=alice.id, user2_id=bob.id
+    )
+    await MessageService.send_message(
+        db, conversation=conversation, sender_id=alice.id, content="missed"
+    )
+
+    token = create_access_token(str(bob.id))
+
+    with TestClient(app) as client:
+        with client.websocket_connect(f"/ws?token={token}") as ws:
+            ws.send_json({"event": "reconnect", "last_seq": {str(conversation.id): 0}})
+
+            missed = ws.receive_json()
+            assert missed["event"] == "missed_messages"
+            assert [m["content"] for m in missed["messages"]] == ["missed"]
+
+            done = ws.receive_json()
+            assert done["event"] == "reconnect_success"
+            assert done["conversations"][str(conversation.id)]["seq"] == 1